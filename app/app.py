@@ -1,9 +1,11 @@
 from __future__ import annotations
 import os
+import copy
 import json
 import html
 import re
 import datetime
+import time
 import streamlit as st
 
 import sys
@@ -24,13 +26,13 @@ def _rerun():
 
 from boardbrain.case_store import (
     create_case, list_cases, get_case, delete_case,
-    add_measurement, add_note, list_measurements,
+    add_measurements, add_note, list_measurements,
     save_attachment, list_attachments, init_db,
-    add_chat_message, list_chat_messages,
+    add_chat_message, list_chat_messages_desc, count_chat_messages,
     add_plan_version, get_latest_plan, list_plan_versions,
     set_requested_measurements, mark_requested_measurement_done, list_requested_measurements,
     get_case_delete_summary,
-    add_expected_range, list_expected_ranges, update_expected_range, delete_expected_range,
+    add_expected_range, add_expected_ranges, list_expected_ranges, update_expected_range, delete_expected_range,
 )
 from boardbrain.diagnose import answer_question, generate_plan, extract_requested_measurements_json
 from boardbrain.chat_commands import parse_command
@@ -44,8 +46,9 @@ from boardbrain.netlist import (
     normalize_net_name,
     extract_net_tokens,
     split_measurement_key,
+    _NET_RE as _GUARDRAIL_NET_RE,
 )
-from boardbrain.net_refs import load_net_refs, get_measure_points, measurement_points_for_net, get_measurement_points_from_cache
+from boardbrain.net_refs import load_net_refs, get_measure_points, measurement_points_for_nets, get_measurement_points_from_cache
 from boardbrain.components import (
     load_component_index,
     extract_component_tokens,
@@ -57,6 +60,37 @@ from boardbrain.config import SETTINGS
 
 st.set_page_config(page_title="BoardBrain v1.1", layout="wide")
 
+_SESSION_DEFAULTS = {
+    "confirm_delete_case_id": None,
+    "chat_limit": 20,
+    "net_confirmation": None,
+    "last_message_classification": "",
+    "parsed_measurements": [],
+    "invalid_nets_detected": [],
+    "net_confirmation_pending": False,
+    "auto_update_triggered": False,
+    "completed_measurement_keys": [],
+    "plan_update_reason": "",
+    "rejected_measurement_reasons": [],
+    "net_validation_results": [],
+    "requested_measurements_parse_failed": False,
+    "requested_measurements_parsed_count": 0,
+    "requested_measurements_parse_error": "",
+    "last_plan_json": None,
+    "component_validation_results": [],
+}
+
+
+def _init_session() -> bool:
+    """Seed session_state once per browser session."""
+    for k, v in _SESSION_DEFAULTS.items():
+        st.session_state.setdefault(k, copy.copy(v))
+    return True
+
+
+if not st.session_state.get("_init_done"):
+    st.session_state["_init_done"] = _init_session()
+
 init_db()
 os.makedirs(SETTINGS.data_dir, exist_ok=True)
 os.makedirs(SETTINGS.kb_raw_dir, exist_ok=True)
@@ -223,6 +257,35 @@ def _render_requested_measurements_section(
 
 
 _NET_TOKEN_RE = re.compile(r"\b[A-Z0-9_.+-]{3,}\b")
+_QUESTION_RE = re.compile(
+    r"\?|\b(?:why|how|what|when|where|explain|meaning|clarify|is|are|do|does|can|should)\b",
+    re.IGNORECASE,
+)
+_NEXT_MEASURE_RE = re.compile(r"what .*measure|measure first|measure next|most important measurement", re.IGNORECASE)
+
+
+
+def _guard_chat_response(case: dict, response: str) -> tuple[str, dict]:
+    # Most chat replies name no net at all; skip the netlist load and fuzzy matching for those.
+    if _GUARDRAIL_NET_RE.search(response or "") is None:
+        report = {
+            "board_id": case.get("board_id", ""),
+            "invalid_nets_detected": [],
+            "invalid_plan_items": [],
+            "auto_fixes_applied": [],
+            "suggestions": {},
+            "skipped": True,
+        }
+    else:
+        response, _, report = enforce_net_guardrail(
+            board_id=case.get("board_id", ""),
+            text=response,
+            plan_items=[],
+            case=case,
+        )
+    report["last_run_time_ns"] = time.time_ns()
+    return response, report
+
 
 _EVIDENCE_LINE_RE = re.compile(r"^\s*(?:[-*]\s*)?EVIDENCE\s*:\s*(.+)$", re.IGNORECASE)
 _EVIDENCE_PAGE_RE = re.compile(r"(?:p(?:age)?[.:]?\s*(\d+))", re.IGNORECASE)
@@ -320,6 +383,25 @@ def _render_text_html(text: str, known_nets: set, strip_requested: bool = True)
     return "<br>".join(out_lines)
 
 
+def _set_known_nets(known_nets: set, net_meta: dict) -> None:
+    st.session_state["known_nets"] = known_nets
+    st.session_state["known_nets_meta"] = net_meta
+    # identifies this net set in render caches; bumped on every (re)load
+    st.session_state["known_nets_gen"] = st.session_state.get("known_nets_gen", 0) + 1
+
+
+def _render_plan_html(slot: str, version: int | None, text: str, known_nets: set) -> str:
+    # Plan markdown only changes on plan updates, so keep the last rendering per slot.
+    cache = st.session_state.setdefault("_plan_render_cache", {})
+    key = (version, text, st.session_state.get("known_nets_gen", 0))
+    hit = cache.get(slot)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    rendered = _render_text_html(text, known_nets)
+    cache[slot] = (key, rendered)
+    return rendered
+
+
 def _load_plan_state(case_id: str) -> None:
     if st.session_state.get("active_case_id") != case_id:
         st.session_state["active_case_id"] = case_id
@@ -345,6 +427,13 @@ def _update_plan_state(case_id: str, plan_markdown: str) -> None:
     }
 
 
+def _format_run_time(report: dict) -> str:
+    ns = report.get("last_run_time_ns")
+    if not ns:
+        return report.get("last_run_time", "")
+    return datetime.datetime.fromtimestamp(ns / 1e9, datetime.timezone.utc).replace(tzinfo=None).isoformat()
+
+
 def _next_pending_requested(plan_state: dict) -> dict | None:
     for r in plan_state.get("requested_measurements", []):
         if r.get("status") == "pending":
@@ -352,6 +441,12 @@ def _next_pending_requested(plan_state: dict) -> dict | None:
     return None
 
 
+def _copy_html(report: str) -> str:
+    return f"""
+            <button onclick="navigator.clipboard.writeText({html.escape(json.dumps(report))})">Copy to clipboard</button>
+            """
+
+
 def _build_debug_report(
     case: dict,
     net_meta: dict,
@@ -546,7 +641,7 @@ def _build_debug_report(
     lines.append("")
     lines.append("Rail-Name Guardrail")
     if guardrail_report:
-        lines.append(f"- last_run_time: {guardrail_report.get('last_run_time','')}")
+        lines.append(f"- last_run_time: {_format_run_time(guardrail_report)}")
         if guardrail_report.get("classification"):
             lines.append(f"- classification: {guardrail_report.get('classification')}")
         invalid = guardrail_report.get("invalid_nets_detected") or []
@@ -644,7 +739,7 @@ if mode == "Baselines":
     ba_type = st.selectbox("Type", ["board_photo", "scope", "thermal", "boardview_screenshot", "schematic_pdf", "other"], key="ba_type")
     bup = st.file_uploader("Upload file", key="bup")
     if st.button("Save baseline attachment") and bup is not None:
-        save_baseline_attachment(b["baseline_id"], bup.name, bup.getvalue(), ba_type)
+        save_baseline_attachment(b["baseline_id"], bup.name, bup, ba_type)
         _rerun()
 
     bats = list_baseline_attachments(b["baseline_id"])
@@ -667,8 +762,6 @@ if mode == "Baselines":
 
 with st.sidebar:
     st.header("Cases")
-    if "confirm_delete_case_id" not in st.session_state:
-        st.session_state["confirm_delete_case_id"] = None
     if st.session_state.get("case_deleted_message"):
         st.success(st.session_state["case_deleted_message"])
         st.session_state["case_deleted_message"] = None
@@ -758,8 +851,7 @@ with st.sidebar:
                         st.session_state["active_case_id"] = None
                         st.session_state["plan_state"] = None
                         st.session_state["known_nets_case_id"] = None
-                        st.session_state["known_nets"] = set()
-                        st.session_state["known_nets_meta"] = {}
+                        _set_known_nets(set(), {})
                         st.session_state["net_refs_case_id"] = None
                         st.session_state["net_refs"] = {}
                         st.session_state["net_refs_meta"] = {}
@@ -784,20 +876,20 @@ if not case:
 if st.session_state.get("known_nets_case_id") != case["case_id"]:
     known_nets, net_meta = load_netlist(board_id=case.get("board_id", ""), model=case.get("model", ""), case=case)
     st.session_state["known_nets_case_id"] = case["case_id"]
-    st.session_state["known_nets"] = known_nets
-    st.session_state["known_nets_meta"] = net_meta
+    # Previews only depend on the loaded netlist; build them once per load, not on every rerun.
+    sorted_nets = sorted(known_nets)
+    net_meta["nets_preview"] = sorted_nets[:50]
+    signal_nets = [n for n in sorted_nets if not n.startswith("PP")]
+    net_meta["pp_net_count"] = len(sorted_nets) - len(signal_nets)
+    net_meta["signal_net_count"] = len(signal_nets)
+    net_meta["non_pp_preview"] = signal_nets[:25]
+    net_meta["signal_suffix_preview"] = [
+        n for n in signal_nets if any(n.endswith(suf) or n.endswith(f"_{suf}") for suf in _SIGNAL_SUFFIXES)
+    ][:25]
+    _set_known_nets(known_nets, net_meta)
 else:
     known_nets = st.session_state.get("known_nets", set())
     net_meta = st.session_state.get("known_nets_meta", {})
-net_meta["nets_preview"] = sorted(list(known_nets))[:50]
-pp_nets = sorted([n for n in known_nets if n.startswith("PP")])
-signal_nets = sorted([n for n in known_nets if not n.startswith("PP")])
-net_meta["pp_net_count"] = len(pp_nets)
-net_meta["signal_net_count"] = len(signal_nets)
-net_meta["non_pp_preview"] = signal_nets[:25]
-net_meta["signal_suffix_preview"] = [
-    n for n in signal_nets if any(n.endswith(suf) or n.endswith(f"_{suf}") for suf in _SIGNAL_SUFFIXES)
-][:25]
 _load_plan_state(case["case_id"])
 
 if st.session_state.get("known_components_case_id") != case["case_id"]:
@@ -805,13 +897,13 @@ if st.session_state.get("known_components_case_id") != case["case_id"]:
         board_id=case.get("board_id", ""), model=case.get("model", ""), case=case
     )
     st.session_state["known_components_case_id"] = case["case_id"]
+    comp_meta["components_preview_full"] = sorted(known_components)
+    comp_meta["components_preview"] = comp_meta["components_preview_full"][:50]
     st.session_state["known_components"] = known_components
     st.session_state["components_meta"] = comp_meta
 else:
     known_components = st.session_state.get("known_components", set())
     comp_meta = st.session_state.get("components_meta", {})
-comp_meta["components_preview"] = sorted(list(known_components))[:50]
-comp_meta["components_preview_full"] = sorted(list(known_components))
 
 if st.session_state.get("net_refs_case_id") != case["case_id"]:
     net_refs, net_refs_meta = load_net_refs(
@@ -861,8 +953,7 @@ with st.sidebar.expander("Debug / Netlist / Plan State", expanded=False):
         st.write(f"- boardview_parse_error: {net_meta.get('boardview_parse_error')}")
     if st.button("Force reload netlist", key="force_reload_netlist"):
         st.session_state["known_nets_case_id"] = None
-        st.session_state["known_nets"] = set()
-        st.session_state["known_nets_meta"] = {}
+        _set_known_nets(set(), {})
         _rerun()
     st.write("Net→RefDes Index Status:")
     st.write(f"- source: {net_refs_meta.get('source','unknown')}")
@@ -993,7 +1084,7 @@ with st.sidebar.expander("Debug / Netlist / Plan State", expanded=False):
 
     st.write("Rail-name Guardrail:")
     if guardrail_report:
-        st.write(f"- last_run_time: {guardrail_report.get('last_run_time','')}")
+        st.write(f"- last_run_time: {_format_run_time(guardrail_report)}")
         if guardrail_report.get("classification"):
             st.write(f"- classification: {guardrail_report.get('classification')}")
         st.write(f"- invalid_nets_detected: {len(guardrail_report.get('invalid_nets_detected') or [])}")
@@ -1032,13 +1123,9 @@ with st.sidebar.expander("Debug / Netlist / Plan State", expanded=False):
     report = st.session_state.get("debug_report")
     if report:
         st.code(report)
-        st.components.v1.html(
-            f"""
-            <button onclick="navigator.clipboard.writeText({json.dumps(report)})">Copy to clipboard</button>
-            """,
-            height=40,
-        )
-        st.text_area("Debug report (manual copy)", value=report, height=200)
+        st.components.v1.html(_copy_html(report), height=40)
+        if st.checkbox("Show manual copy box", value=False, key="show_manual_copy"):
+            st.text_area("Debug report (manual copy)", value=report, height=200)
 
 st.subheader("Case")
 st.write(f"**{case['case_id']}** — {case['title']}")
@@ -1048,36 +1135,7 @@ st.write(f"Symptom: {case.get('symptom','')}")
 update_trigger = False
 done_trigger = False
 derived_from_message_id = None
-if "net_confirmation" not in st.session_state:
-    st.session_state["net_confirmation"] = None
-if "last_message_classification" not in st.session_state:
-    st.session_state["last_message_classification"] = ""
-if "parsed_measurements" not in st.session_state:
-    st.session_state["parsed_measurements"] = []
-if "invalid_nets_detected" not in st.session_state:
-    st.session_state["invalid_nets_detected"] = []
-if "net_confirmation_pending" not in st.session_state:
-    st.session_state["net_confirmation_pending"] = False
-if "auto_update_triggered" not in st.session_state:
-    st.session_state["auto_update_triggered"] = False
-if "completed_measurement_keys" not in st.session_state:
-    st.session_state["completed_measurement_keys"] = []
-if "plan_update_reason" not in st.session_state:
-    st.session_state["plan_update_reason"] = ""
-if "rejected_measurement_reasons" not in st.session_state:
-    st.session_state["rejected_measurement_reasons"] = []
-if "net_validation_results" not in st.session_state:
-    st.session_state["net_validation_results"] = []
-if "requested_measurements_parse_failed" not in st.session_state:
-    st.session_state["requested_measurements_parse_failed"] = False
-if "requested_measurements_parsed_count" not in st.session_state:
-    st.session_state["requested_measurements_parsed_count"] = 0
-if "requested_measurements_parse_error" not in st.session_state:
-    st.session_state["requested_measurements_parse_error"] = ""
-if "last_plan_json" not in st.session_state:
-    st.session_state["last_plan_json"] = None
-if "component_validation_results" not in st.session_state:
-    st.session_state["component_validation_results"] = []
+
 
 def _mark_done_from_existing_measurements(case_id: str, requested: list) -> None:
     meas = list_measurements(case_id)
@@ -1109,13 +1167,14 @@ def _run_plan_update(
     with st.spinner("Thinking..."):
         plan_text = generate_plan(case, prompt, include_images=True, done_mode=done_mode)
     known_nets = st.session_state.get("known_nets", set())
+    known_refdes = st.session_state.get("known_components", set())
+    net_to_refdes = st.session_state.get("net_refs", {})
     items_json, plan_text_display, json_err = extract_requested_measurements_json(plan_text)
     st.session_state["last_plan_json"] = items_json if items_json else None
     items = []
     parse_meta = {"parse_failed": False, "parse_error": ""}
     plan_text_display = _strip_cheat_sheet(plan_text_display)
     if items_json:
-        known_refdes = st.session_state.get("known_components", set())
         items, err = normalize_requested_items(items_json, known_nets=known_nets, known_refdes=known_refdes)
         if err == "json_item_unknown_net":
             items, err = normalize_requested_items(items_json, known_nets=None, known_refdes=known_refdes)
@@ -1129,7 +1188,6 @@ def _run_plan_update(
     else:
         items, parse_meta = parse_requested_measurements(plan_text_display, known_nets=known_nets)
         if items:
-            known_refdes = st.session_state.get("known_components", set())
             invalid_refdes = []
             for item in items:
                 meta = item.get("meta") or {}
@@ -1176,17 +1234,15 @@ def _run_plan_update(
                     allow_tokens.add(part)
     comp_guarded_text, comp_report = enforce_component_guardrail(
         plan_text_display,
-        st.session_state.get("known_components", set()),
+        known_refdes,
         allow_tokens=allow_tokens,
     )
     plan_text_display = comp_guarded_text
     report["invalid_refdes_detected"] = comp_report.get("invalid_refdes", [])
     report["refdes_replaced_count"] = comp_report.get("replaced_count", 0)
-    report["last_run_time"] = datetime.datetime.utcnow().isoformat()
+    report["last_run_time_ns"] = time.time_ns()
     st.session_state["guardrail_report"] = report
     st.session_state["requested_measurements_parsed_count"] = len(items)
-    net_to_refdes = st.session_state.get("net_refs", {})
-    known_refdes = st.session_state.get("known_components", set())
     plan_text_display = _render_requested_measurements_section(
         plan_text_display,
         items,
@@ -1211,24 +1267,28 @@ def _run_plan_update(
             meta["aliases"] = build_aliases_for_key(it["key"])
         it["meta"] = meta
     if items and not st.session_state.get("requested_measurements_parse_failed"):
-        known_components = st.session_state.get("known_components", set())
+        item_nets = []
         for it in items:
             meta = it.get("meta") or {}
             net = canonicalize_net_name(meta.get("net") or "")
             if not net:
                 _, net_part, _ = split_measurement_key(it.get("key", ""))
                 net = canonicalize_net_name(net_part)
+            item_nets.append(net)
+        points_by_net = measurement_points_for_nets(
+            case.get("board_id", ""),
+            item_nets,
+            case=case,
+            k=8,
+            known_components=known_refdes,
+        )
+        for it, net in zip(items, item_nets):
+            meta = it.get("meta") or {}
             if net:
                 meta["net"] = net
             if meta.get("type"):
                 meta["type"] = str(meta.get("type"))
-            probe_points = measurement_points_for_net(
-                case.get("board_id", ""),
-                net,
-                case=case,
-                k=8,
-                known_components=known_components,
-            )
+            probe_points = points_by_net.get(net, [])
             if probe_points:
                 counts = {}
                 for ref in probe_points:
@@ -1272,7 +1332,8 @@ def _persist_measurements_and_update(
         for a in aliases:
             alias_map[normalize_net_name(a)] = r["key"]
 
-    completed = []
+    completed: set[str] = set()
+    to_save: list[dict] = []
     for m in entries:
         net = canonicalize_net_name(m.get("net", ""))
         if not net:
@@ -1287,14 +1348,14 @@ def _persist_measurements_and_update(
         if m.get("key_hint"):
             note_parts.append(f"key_hint:{m['key_hint']}")
         note = " | ".join(note_parts)
-        add_measurement(case["case_id"], name, m.get("value", ""), m.get("unit", ""), note)
+        to_save.append({"name": name, "value": m.get("value", ""), "unit": m.get("unit", ""), "note": note})
 
         key_hint = (m.get("key_hint") or "").upper()
         if key_hint:
             for r in requested:
                 if r["key"].upper() == key_hint:
                     mark_requested_measurement_done(case["case_id"], r["key"])
-                    completed.append(r["key"])
+                    completed.add(r["key"])
                     break
 
         candidates = [normalize_net_name(net)]
@@ -1302,7 +1363,7 @@ def _persist_measurements_and_update(
             match_key = alias_map.get(cand)
             if match_key:
                 mark_requested_measurement_done(case["case_id"], match_key)
-                completed.append(match_key)
+                completed.add(match_key)
                 break
 
         if m_type == "continuity" and net.upper().startswith("F"):
@@ -1310,10 +1371,16 @@ def _persist_measurements_and_update(
                 key_u = r["key"].upper()
                 if "FUSE" in key_u or net.upper() in key_u:
                     mark_requested_measurement_done(case["case_id"], r["key"])
-                    completed.append(r["key"])
+                    completed.add(r["key"])
                     break
-
-    st.session_state["completed_measurement_keys"] = sorted(set(completed))
+    add_measurements(case["case_id"], to_save)
+
+    if completed:
+        new_keys = sorted(completed)
+        if new_keys != st.session_state.get("completed_measurement_keys"):
+            st.session_state["completed_measurement_keys"] = new_keys
+    elif st.session_state.get("completed_measurement_keys"):
+        st.session_state["completed_measurement_keys"] = []
     st.session_state["auto_update_triggered"] = True
     st.session_state["plan_update_reason"] = "auto_measurements"
     _run_plan_update(
@@ -1326,13 +1393,7 @@ def _persist_measurements_and_update(
     )
     if question_text:
         response = answer_question(case, question_text, include_images=True)
-        response, _, report = enforce_net_guardrail(
-            board_id=case.get("board_id", ""),
-            text=response,
-            plan_items=[],
-            case=case,
-        )
-        report["last_run_time"] = datetime.datetime.utcnow().isoformat()
+        response, report = _guard_chat_response(case, response)
         st.session_state["guardrail_report"] = report
         add_chat_message(case["case_id"], "assistant", f"Plan updated from measurements.\\n\\n{response}")
 
@@ -1341,22 +1402,18 @@ left, right = st.columns([2, 1])
 
 with left:
     st.subheader("Chat")
-    if "chat_limit" not in st.session_state:
-        st.session_state["chat_limit"] = 20
-    messages = list_chat_messages(case["case_id"])
-    messages_rev = list(reversed(messages))
     known_nets = st.session_state.get("known_nets", set())
 
     with st.form("chat_form", clear_on_submit=True):
         user_text = st.text_input("Message")
         submitted = st.form_submit_button("Send")
 
-    display_messages = messages_rev[: st.session_state["chat_limit"]]
+    display_messages = list_chat_messages_desc(case["case_id"], st.session_state["chat_limit"])
     for m in display_messages:
         with st.chat_message(m["role"]):
             st.markdown(_render_text_html(m["content"], known_nets), unsafe_allow_html=True)
 
-    if len(messages_rev) > st.session_state["chat_limit"]:
+    if count_chat_messages(case["case_id"]) > st.session_state["chat_limit"]:
         if st.button("Load older messages", key="load_older"):
             st.session_state["chat_limit"] += 20
             _rerun()
@@ -1383,6 +1440,7 @@ with left:
             _run_plan_update(
                 done_mode=(cmd["type"] == "done"),
                 derived_id=derived_from_message_id,
+                rerun=False,
                 reason=reason,
                 auto_update=False,
             )
@@ -1405,7 +1463,7 @@ with left:
                     comp_invalid.append(ref)
             st.session_state["component_validation_results"] = comp_results
 
-            comp_meas = parse_component_measurements(user_text)
+            comp_meas = parse_component_measurements(user_text) if comp_tokens else []
             if comp_meas:
                 st.session_state["last_message_classification"] = "component_measurement"
                 invalid_refs = [m for m in comp_meas if m["refdes"] not in known_components]
@@ -1420,10 +1478,18 @@ with left:
                     add_chat_message(case["case_id"], "assistant", "\n".join(lines) + "\n\nPlan unchanged.")
                     should_rerun = True
                 else:
-                    for m in comp_meas:
-                        name = f"COMP:{m['refdes']}.{m['loc']}"
-                        note = f"type:component | raw:{m['raw']}"
-                        add_measurement(case["case_id"], name, m["value"], m["unit"], note)
+                    add_measurements(
+                        case["case_id"],
+                        [
+                            {
+                                "name": f"COMP:{m['refdes']}.{m['loc']}",
+                                "value": m["value"],
+                                "unit": m["unit"],
+                                "note": f"type:component | raw:{m['raw']}",
+                            }
+                            for m in comp_meas
+                        ],
+                    )
                     add_chat_message(case["case_id"], "assistant", "Saved component measurements. Plan unchanged.")
                     should_rerun = True
                 if should_rerun:
@@ -1493,7 +1559,7 @@ with left:
             st.session_state["parsed_measurements"] = entries
             st.session_state["invalid_nets_detected"] = [i.get("net_raw") for i in invalid if i.get("net_raw")]
 
-            question_present = bool(re.search(r"\\?|\\b(why|how|what|when|where|explain|meaning|clarify|is|are|do|does|can|should)\\b", user_text, re.IGNORECASE))
+            question_present = bool(_QUESTION_RE.search(user_text))
 
             if invalid:
                 st.session_state["last_message_classification"] = "measurement"
@@ -1543,14 +1609,14 @@ with left:
                     response = "\n".join(lines)
                     add_chat_message(case["case_id"], "assistant", response + "\n\nPlan unchanged.")
                     st.session_state["guardrail_report"] = {
-                        "last_run_time": datetime.datetime.utcnow().isoformat(),
+                        "last_run_time_ns": time.time_ns(),
                         "invalid_nets_detected": sorted(set(invalid_user_nets)),
                         "auto_fixes_applied": [],
                         "suggestions": suggestions,
                         "source": "user_input",
                     }
                     should_rerun = True
-                elif re.search(r"what .*measure|measure first|measure next|most important measurement", user_text, re.IGNORECASE):
+                elif _NEXT_MEASURE_RE.search(user_text):
                     plan_state = st.session_state.get("plan_state") or {}
                     next_req = _next_pending_requested(plan_state)
                     if next_req:
@@ -1567,16 +1633,10 @@ with left:
                         next_req = _next_pending_requested(plan_state)
                         if next_req:
                             add_chat_message(case["case_id"], "assistant", f"{next_req['key']}: {next_req['prompt']}")
-                    _rerun()
+                    should_rerun = True
                 else:
                     response = answer_question(case, user_text, include_images=True)
-                    response, _, report = enforce_net_guardrail(
-                        board_id=case.get("board_id", ""),
-                        text=response,
-                        plan_items=[],
-                        case=case,
-                    )
-                    report["last_run_time"] = datetime.datetime.utcnow().isoformat()
+                    response, report = _guard_chat_response(case, response)
                     report["classification"] = st.session_state.get("last_message_classification")
                     st.session_state["guardrail_report"] = report
                     add_chat_message(case["case_id"], "assistant", response + "\n\nPlan unchanged.")
@@ -1591,50 +1651,54 @@ with left:
             invalid_items = pending.get("invalid", [])
             suggestions = pending.get("suggestions", {})
             selections = {}
-            for i in invalid_items:
-                raw = i.get("net_raw") or i.get("net") or ""
-                options = suggestions.get(raw, [])
-                options = ["-- select --"] + options + ["Other...", "Cancel"]
-                choice = st.selectbox(f"Replace {raw}", options, key=f"confirm_{raw}")
-                if choice == "Other...":
-                    manual = st.text_input(f"Enter valid net for {raw}", value="", key=f"manual_{raw}")
-                    selections[raw] = manual.strip()
+            # A form keeps selection changes client-side until one of the buttons is pressed.
+            with st.form("net_confirmation_form"):
+                for i in invalid_items:
+                    raw = i.get("net_raw") or i.get("net") or ""
+                    options = suggestions.get(raw, [])
+                    options = ["-- select --"] + options + ["Other...", "Cancel"]
+                    choice = st.selectbox(f"Replace {raw}", options, key=f"confirm_{raw}")
+                    manual = st.text_input(f"Enter valid net for {raw} (with Other...)", value="", key=f"manual_{raw}")
+                    if choice == "Other...":
+                        selections[raw] = manual.strip()
+                    else:
+                        selections[raw] = choice
+                c1, c2 = st.columns([1, 1])
+                with c1:
+                    confirm_clicked = st.form_submit_button("Confirm nets")
+                with c2:
+                    cancel_clicked = st.form_submit_button("Cancel")
+            if confirm_clicked:
+                if any(v in ("", "-- select --", "Cancel", "Other...") for v in selections.values()):
+                    st.warning("Select a valid net for each entry or cancel.")
                 else:
-                    selections[raw] = choice
-            c1, c2 = st.columns([1, 1])
-            with c1:
-                if st.button("Confirm nets", key="confirm_nets"):
-                    if any(v in ("", "-- select --", "Cancel", "Other...") for v in selections.values()):
-                        st.warning("Select a valid net for each entry or cancel.")
+                    invalid_manual = [v for v in selections.values() if canonicalize_net_name(v) not in known_nets]
+                    if invalid_manual:
+                        st.warning("One or more selected nets are not in the netlist.")
                     else:
-                        invalid_manual = [v for v in selections.values() if canonicalize_net_name(v) not in known_nets]
-                        if invalid_manual:
-                            st.warning("One or more selected nets are not in the netlist.")
-                        else:
-                            updated_entries = []
-                            for m in pending.get("entries", []) + invalid_items:
-                                net = m.get("net") or ""
-                                raw = m.get("net_raw") or m.get("net") or ""
-                                if raw in selections:
-                                    net = selections[raw]
-                                updated = dict(m)
-                                updated["net"] = net
-                                updated_entries.append(updated)
-                            st.session_state["net_confirmation"] = None
-                            st.session_state["net_confirmation_pending"] = False
-                            _persist_measurements_and_update(
-                                updated_entries,
-                                pending.get("question_text") or None,
-                                pending.get("message_id"),
-                            )
-                            add_chat_message(case["case_id"], "assistant", "Measurements saved after net confirmation.")
-                            _rerun()
-            with c2:
-                if st.button("Cancel", key="cancel_nets"):
-                    st.session_state["net_confirmation"] = None
-                    st.session_state["net_confirmation_pending"] = False
-                    add_chat_message(case["case_id"], "assistant", "Net confirmation canceled.")
-                    _rerun()
+                        updated_entries = []
+                        for m in pending.get("entries", []) + invalid_items:
+                            net = m.get("net") or ""
+                            raw = m.get("net_raw") or m.get("net") or ""
+                            if raw in selections:
+                                net = selections[raw]
+                            updated = dict(m)
+                            updated["net"] = net
+                            updated_entries.append(updated)
+                        st.session_state["net_confirmation"] = None
+                        st.session_state["net_confirmation_pending"] = False
+                        _persist_measurements_and_update(
+                            updated_entries,
+                            pending.get("question_text") or None,
+                            pending.get("message_id"),
+                        )
+                        add_chat_message(case["case_id"], "assistant", "Measurements saved after net confirmation.")
+                        _rerun()
+            if cancel_clicked:
+                st.session_state["net_confirmation"] = None
+                st.session_state["net_confirmation_pending"] = False
+                add_chat_message(case["case_id"], "assistant", "Net confirmation canceled.")
+                _rerun()
 
     with st.expander("Attachments (evidence)", expanded=False):
         st.caption(
@@ -1647,7 +1711,7 @@ with left:
         )
         up = st.file_uploader("Upload file", key="attach_upload")
         if st.button("Save attachment") and up is not None:
-            save_attachment(case["case_id"], up.name, up.getvalue(), a_type)
+            save_attachment(case["case_id"], up.name, up, a_type)
             _rerun()
 
         atts = list_attachments(case["case_id"])
@@ -1721,7 +1785,7 @@ with left:
             if not board_id:
                 st.warning("Board ID missing for this case.")
             else:
-                added = 0
+                new_ranges = []
                 lines = [l.strip() for l in bulk_text.splitlines() if l.strip()]
                 for line in lines:
                     parts = [p.strip() for p in line.split(",")]
@@ -1749,17 +1813,19 @@ with left:
                         continue
                     if known_nets and canon not in known_nets:
                         continue
-                    add_expected_range(
-                        board_id=board_id,
-                        net=canon,
-                        measurement_type=mtype,
-                        expected_min=value,
-                        expected_max=value,
-                        unit=unit,
-                        source="known-good-board",
-                        note=note,
+                    new_ranges.append(
+                        {
+                            "net": canon,
+                            "measurement_type": mtype,
+                            "expected_min": value,
+                            "expected_max": value,
+                            "unit": unit,
+                            "source": "known-good-board",
+                            "note": note,
+                        }
                     )
-                    added += 1
+                add_expected_ranges(board_id, new_ranges)
+                added = len(new_ranges)
                 st.success(f"Imported {added} entries.")
                 _rerun()
         st.divider()
@@ -1771,7 +1837,7 @@ with left:
             else:
                 existing = list_expected_ranges(board_id)
                 seen = {(r["net"], r["measurement_type"], r.get("expected_min"), r.get("expected_max"), r.get("unit"), r.get("source")) for r in existing}
-                added = 0
+                new_ranges = []
                 for b in list_baselines():
                     if b.get("board_id") != board_id:
                         continue
@@ -1799,18 +1865,20 @@ with left:
                         key = (net, mtype, value, value, unit, "baseline")
                         if key in seen:
                             continue
-                        add_expected_range(
-                            board_id=board_id,
-                            net=net,
-                            measurement_type=mtype,
-                            expected_min=value,
-                            expected_max=value,
-                            unit=unit,
-                            source="baseline",
-                            note=m.get("note") or "",
+                        new_ranges.append(
+                            {
+                                "net": net,
+                                "measurement_type": mtype,
+                                "expected_min": value,
+                                "expected_max": value,
+                                "unit": unit,
+                                "source": "baseline",
+                                "note": m.get("note") or "",
+                            }
                         )
                         seen.add(key)
-                        added += 1
+                add_expected_ranges(board_id, new_ranges)
+                added = len(new_ranges)
                 st.success(f"Imported {added} baseline measurements.")
                 _rerun()
         existing = list_expected_ranges(board_id) if board_id else []
@@ -1884,16 +1952,18 @@ with right:
     st.caption(" | ".join([p for p in watermark_parts if p]))
     if latest_plan:
         known_nets = st.session_state.get("known_nets", set())
+        history = plan_state.get("plan_history") or []
+        latest_version = history[0]["version"] if history else None
         plan_lines = latest_plan.splitlines()
         max_lines = 24
         if len(plan_lines) > max_lines:
             preview = "\n".join(plan_lines[:max_lines]).rstrip()
             preview = preview + "\n…"
-            st.markdown(_render_text_html(preview, known_nets), unsafe_allow_html=True)
+            st.markdown(_render_plan_html("preview", latest_version, preview, known_nets), unsafe_allow_html=True)
             with st.expander(f"Show full plan ({len(plan_lines)} lines)", expanded=False):
-                st.markdown(_render_text_html(latest_plan, known_nets), unsafe_allow_html=True)
+                st.markdown(_render_plan_html("full", latest_version, latest_plan, known_nets), unsafe_allow_html=True)
         else:
-            st.markdown(_render_text_html(latest_plan, known_nets), unsafe_allow_html=True)
+            st.markdown(_render_plan_html("full", latest_version, latest_plan, known_nets), unsafe_allow_html=True)
     else:
         st.info("No plan yet. Use Update Plan to generate the first plan.")
 
@@ -1956,7 +2026,7 @@ with right:
         selected_label = st.selectbox("Select plan version", list(labels.keys()))
         selected_plan = labels[selected_label]
         known_nets = st.session_state.get("known_nets", set())
-        st.markdown(_render_text_html(selected_plan["plan_markdown"], known_nets), unsafe_allow_html=True)
+        st.markdown(_render_plan_html("history", selected_plan["version"], selected_plan["plan_markdown"], known_nets), unsafe_allow_html=True)
     else:
         st.write("No previous plans.")
 
@@ -1,9 +1,21 @@
 from __future__ import annotations
 import os
 import json
+import functools
+import hashlib
+import importlib
+import mmap
 import re
-import struct
-from typing import Dict, Any, List, Tuple, Optional
+import tempfile
+from collections import defaultdict
+from typing import Dict, Any, Callable, List, Tuple, Optional
+
+import numpy as np
+
+try:
+    import orjson as _orjson
+except Exception:
+    _orjson = None
 
 from ..config import SETTINGS
 from ..netlist import canonicalize_net_name
@@ -11,19 +23,44 @@ from ..netlist import canonicalize_net_name
 
 _NET_RE = re.compile(r"\b(?:PP[A-Z0-9_.]+|[A-Z][A-Z0-9_.]*_[A-Z0-9_.]+)\b", re.IGNORECASE)
 _REFDES_RE = re.compile(r"\b(?:TP|FB|C|R|L|D|Q|U|F|X|J|P)\d{1,5}\b", re.IGNORECASE)
-_STR_ALLOWED = re.compile(r"^[A-Za-z0-9_./\-+:#]+$")
+_NET_OR_REFDES_RE = re.compile(
+    r"(?P<net>\b(?:PP[A-Z0-9_.]+|[A-Z][A-Z0-9_.]*_[A-Z0-9_.]+)\b)"
+    r"|(?P<ref>\b(?:TP|FB|C|R|L|D|Q|U|F|X|J|P)\d{1,5}\b)",
+    re.IGNORECASE,
+)
+# Matched against raw bytes; group 1 is the candidate with surrounding spaces trimmed.
+_STR_ALLOWED = re.compile(rb" *([A-Za-z0-9_./\-+:#]+) *")
 _BVRAW_HEADER = "BVRAW_FORMAT_3"
+_BVRAW_HEADER_B = _BVRAW_HEADER.encode("ascii")
+_BVRAW_RECORD_PREFIXES = ("PART_NAME", "PART_END", "PIN_NET")
+# BRD text markers live in the leading header records; don't scan whole dumps for them.
+_BRD_SNIFF_BYTES = 8192
+
+# Format-specific parsers, imported on first use: (module relative to this package, attribute).
+_FORMAT_HANDLERS: Dict[str, Tuple[str, str]] = {
+    "BVRAW_FORMAT_3": (".", "parse_bvraw_format_3"),
+    "PCB_EMBEDDED_ZLIB": ("..pcb_boardview", "parse_pcb_zlib_container"),
+    "BRD": (".brd_parser", "parse_brd"),
+    "XZZPCB": (".xzzpcb_parser", "parse_xzzpcb"),
+    "TVW_STRINGS": (".tvw_parser", "parse_tvw"),
+}
+_HANDLERS: Dict[str, Callable[[str], Any]] = {}
+
+_PARSE_CACHE: Dict[Tuple[str, int, int], Tuple[set[str], Dict[str, List[Dict[str, Any]]], Dict[str, Any]]] = {}
+# Stored with each on-disk parse result; bump it whenever a parser's output changes so results
+# cached by older code are re-parsed instead of reused.
+_PARSE_CACHE_VERSION = 2
 
 
 def detect_boardview_format(path: str, data: bytes) -> str | None:
     ext = os.path.splitext(path)[1].lower()
-    try:
-        header = data[:128].decode("ascii", errors="ignore").splitlines()[0].strip()
-    except Exception:
-        header = ""
-    if _BVRAW_HEADER in header:
+    head = data[:128]
+    if head.startswith(_BVRAW_HEADER_B):
+        return "BVRAW_FORMAT_3"
+    first_line = head.split(b"\n", 1)[0].split(b"\r", 1)[0]
+    if _BVRAW_HEADER_B in first_line:
         return "BVRAW_FORMAT_3"
-    magic = data[:4]
+    magic = head[:4]
     if magic in (b"BVR2", b"BVRE"):
         return "BVR2"
     if magic[:3] == b"BVR":
@@ -33,7 +70,12 @@ def detect_boardview_format(path: str, data: bytes) -> str | None:
         if verify_xzzpcb(data):
             return "XZZPCB"
     if ext == ".brd":
-        if data.startswith(b"\x23\xe2\x63\x28") or b"str_length:" in data or b"var_data:" in data or b"BRDOUT:" in data:
+        if (
+            head.startswith(b"\x23\xe2\x63\x28")
+            or data.find(b"str_length:", 0, _BRD_SNIFF_BYTES) != -1
+            or data.find(b"var_data:", 0, _BRD_SNIFF_BYTES) != -1
+            or data.find(b"BRDOUT:", 0, _BRD_SNIFF_BYTES) != -1
+        ):
             return "BRD"
     if ext == ".tvw":
         return "TVW_STRINGS"
@@ -46,42 +88,40 @@ def detect_boardview_format(path: str, data: bytes) -> str | None:
 
 def _extract_ascii_strings(data: bytes, min_len: int = 2, max_len: int = 80) -> List[Tuple[int, str]]:
     out: List[Tuple[int, str]] = []
-    i = 0
     n = len(data)
-    while i < n:
-        if 32 <= data[i] <= 126:
-            start = i
-            i += 1
-            while i < n and 32 <= data[i] <= 126:
-                i += 1
-            length = i - start
-            if min_len <= length <= max_len and i < n and data[i] == 0:
-                s = data[start:i].decode("ascii", errors="ignore").strip()
-                if s and _STR_ALLOWED.match(s):
-                    out.append((start, s))
-        i += 1
+    if not n:
+        return out
+    arr = np.frombuffer(data, dtype=np.uint8)
+    printable = ((arr >= 32) & (arr <= 126)).view(np.int8)
+    edges = np.diff(printable, prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    lengths = ends - starts
+    keep = (lengths >= min_len) & (lengths <= max_len) & (ends < n)
+    starts = starts[keep]
+    ends = ends[keep]
+    terminated = arr[ends] == 0
+    for start, end in zip(starts[terminated].tolist(), ends[terminated].tolist()):
+        m = _STR_ALLOWED.fullmatch(data, start, end)
+        if m:
+            out.append((start, m.group(1).decode("ascii")))
     return out
 
 
 def _find_offset_runs(data: bytes, offsets: set[int], min_len: int = 20) -> List[Tuple[int, List[int]]]:
     runs: List[Tuple[int, List[int]]] = []
-    i = 0
-    n = len(data)
-    while i + 4 <= n:
-        val = struct.unpack_from("<I", data, i)[0]
-        if val in offsets:
-            start = i
-            values: List[int] = []
-            while i + 4 <= n:
-                val = struct.unpack_from("<I", data, i)[0]
-                if val not in offsets:
-                    break
-                values.append(val)
-                i += 4
-            if len(values) >= min_len:
-                runs.append((start, values))
-        else:
-            i += 4
+    words = len(data) // 4
+    if not words or not offsets:
+        return runs
+    u32 = np.frombuffer(data, dtype="<u4", count=words)
+    targets = np.fromiter(offsets, dtype=np.uint32, count=len(offsets))
+    mask = np.isin(u32, targets).view(np.int8)
+    edges = np.diff(mask, prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    keep = (ends - starts) >= min_len
+    for start, end in zip(starts[keep].tolist(), ends[keep].tolist()):
+        runs.append((start * 4, u32[start:end].tolist()))
     return runs
 
 
@@ -90,10 +130,9 @@ def _choose_best_run(runs: List[Tuple[int, List[int]]], strings: Dict[int, str])
     best_items: List[str] = []
     best_score = 0
     for start, offsets in runs:
-        items = [strings.get(o, "") for o in offsets]
-        items = [i for i in items if i]
-        uniq = len(set(items))
-        score = len(items) + uniq
+        # Order and duplicates matter: pin records index into this table.
+        items = [s for s in map(strings.get, offsets) if s]
+        score = len(items) + len(set(items))
         if score > best_score:
             best_score = score
             best_start = start
@@ -101,6 +140,18 @@ def _choose_best_run(runs: List[Tuple[int, List[int]]], strings: Dict[int, str])
     return best_start, best_items
 
 
+def _chain_run_lengths(valid: np.ndarray, step: int) -> np.ndarray:
+    """For each index j, count consecutive True values at j, j+step, j+2*step, ..."""
+    out = np.zeros(len(valid), dtype=np.int64)
+    for r in range(step):
+        chain = valid[r::step]
+        pos = np.arange(len(chain))
+        next_false = np.where(chain, len(chain), pos)
+        next_false = np.minimum.accumulate(next_false[::-1])[::-1]
+        out[r::step] = next_false - pos
+    return out
+
+
 def _find_pin_table(
     data: bytes,
     comp_count: int,
@@ -111,27 +162,32 @@ def _find_pin_table(
     stride_candidates = [8, 12, 16, 20, 24]
     orders = ["comp_net", "net_comp"]
     min_records = 50
+    u32 = np.frombuffer(data, dtype="<u4", count=min(len(data), search_end) // 4)
     for stride in stride_candidates:
+        step = stride // 4
+        # word positions whose whole record ends at or before search_end
+        positions = (search_end - stride) // 4 + 1
+        last_start = (search_end - stride * min_records) // 4
+        if positions <= 0 or last_start < 0:
+            continue
+        first = u32[:positions]
+        second = u32[1 : positions + 1]
         for order in orders:
+            if order == "comp_net":
+                valid = (first < comp_count) & (second < net_count)
+            else:
+                valid = (first < net_count) & (second < comp_count)
+            remaining = _chain_run_lengths(valid, step)
             i = 0
-            while i + stride * min_records <= search_end:
-                count = 0
-                while i + stride * (count + 1) <= search_end:
-                    base = i + stride * count
-                    first = struct.unpack_from("<I", data, base)[0]
-                    second = struct.unpack_from("<I", data, base + 4)[0]
-                    if order == "comp_net":
-                        comp_idx, net_idx = first, second
-                    else:
-                        net_idx, comp_idx = first, second
-                    if comp_idx >= comp_count or net_idx >= net_count:
-                        break
-                    count += 1
-                if count >= min_records and count > best[1]:
-                    best = (i, count, order + f":{stride}")
-                    i += stride * count
-                else:
-                    i += 4
+            while i <= last_start:
+                threshold = max(best[1], min_records - 1)
+                hits = np.flatnonzero(remaining[i : last_start + 1] > threshold)
+                if not hits.size:
+                    break
+                j = i + int(hits[0])
+                count = int(remaining[j])
+                best = (j * 4, count, order + f":{stride}")
+                i = j + step * count
     return best
 
 
@@ -144,24 +200,27 @@ def _build_net_refs_from_pin_table(
     comps: List[str],
     nets: List[str],
 ) -> Dict[str, List[Dict[str, Any]]]:
-    net_to_refs: Dict[str, Dict[str, Dict[str, Any]]] = {}
-    for idx in range(count):
-        base = start + stride * idx
-        first = struct.unpack_from("<I", data, base)[0]
-        second = struct.unpack_from("<I", data, base + 4)[0]
-        if order == "comp_net":
-            comp_idx, net_idx = first, second
-        else:
-            net_idx, comp_idx = first, second
-        if comp_idx >= len(comps) or net_idx >= len(nets):
-            continue
-        refdes = comps[comp_idx].upper()
-        net = canonicalize_net_name(nets[net_idx])
+    canon = functools.lru_cache(maxsize=None)(canonicalize_net_name)
+    nets_canon = [canon(n) for n in nets]
+    refdes_upper = [c.upper() for c in comps]
+    kinds = ["TP" if r.startswith("TP") else ("P" if r.startswith("P") else r[:1]) for r in refdes_upper]
+    net_to_refs: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+    if count <= 0:
+        return {}
+    records = np.frombuffer(data, dtype="<u4", count=count * (stride // 4), offset=start).reshape(count, stride // 4)
+    if order == "comp_net":
+        comp_col, net_col = records[:, 0], records[:, 1]
+    else:
+        net_col, comp_col = records[:, 0], records[:, 1]
+    in_range = (comp_col < len(comps)) & (net_col < len(nets))
+    for comp_idx, net_idx in zip(comp_col[in_range].tolist(), net_col[in_range].tolist()):
+        net = nets_canon[net_idx]
         if not net:
             continue
-        kind = "TP" if refdes.startswith("TP") else ("P" if refdes.startswith("P") else refdes[:1])
-        net_to_refs.setdefault(net, {})
-        net_to_refs[net].setdefault(refdes, {"refdes": refdes, "kind": kind})
+        refs = net_to_refs[net]
+        refdes = refdes_upper[comp_idx]
+        if refdes not in refs:
+            refs[refdes] = {"refdes": refdes, "kind": kinds[comp_idx]}
     return {n: list(refs.values()) for n, refs in net_to_refs.items()}
 
 
@@ -178,30 +237,34 @@ def parse_bvraw_format_3_text(text: str) -> Tuple[set[str], Dict[str, List[Dict[
     if _BVRAW_HEADER not in header:
         raise ValueError("missing_bvraw3_header")
 
+    # PIN_NET values repeat heavily (GND, rails), normalize each name once.
+    canon = functools.lru_cache(maxsize=None)(canonicalize_net_name)
+    current_kind = ""
     for raw in lines[1:]:
         line = raw.strip()
-        if not line:
+        if not line.startswith(_BVRAW_RECORD_PREFIXES):
             continue
         if line.startswith("PART_NAME"):
-            current_part = line.split("PART_NAME", 1)[1].strip().upper()
+            current_part = line[9:].strip().upper()
             if current_part:
                 refdes.add(current_part)
+                current_kind = "TP" if current_part.startswith("TP") else ("P" if current_part.startswith("P") else current_part[:1])
             continue
         if line == "PART_END":
             current_part = None
             continue
         if line.startswith("PIN_NET"):
-            net_raw = line.split("PIN_NET", 1)[1].strip()
+            net_raw = line[7:].strip()
             if not net_raw:
                 continue
-            net = canonicalize_net_name(net_raw)
+            net = canon(net_raw)
             if not net:
                 continue
             nets.add(net)
             if current_part:
-                kind = "TP" if current_part.startswith("TP") else ("P" if current_part.startswith("P") else current_part[:1])
-                net_to_refs.setdefault(net, {})
-                net_to_refs[net].setdefault(current_part, {"refdes": current_part, "kind": kind})
+                refs = net_to_refs.setdefault(net, {})
+                if current_part not in refs:
+                    refs[current_part] = {"refdes": current_part, "kind": current_kind}
             continue
 
     if not nets or not refdes:
@@ -222,33 +285,159 @@ def parse_bvraw_format_3(path: str) -> Tuple[set[str], Dict[str, List[Dict[str,
     return parse_bvraw_format_3_text(text)
 
 
+def _dump_json(path: str, data: Dict[str, Any], indent: bool = False) -> None:
+    if _orjson is not None:
+        option = _orjson.OPT_INDENT_2 if indent else 0
+        with open(path, "wb") as f:
+            f.write(_orjson.dumps(data, option=option))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2 if indent else None)
+
+
+def _load_json(path: str) -> Any:
+    if _orjson is not None:
+        with open(path, "rb") as f:
+            return _orjson.loads(f.read())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _parse_cache_path(path: str) -> str:
+    abs_path = os.path.abspath(path)
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", os.path.basename(abs_path))
+    digest = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(SETTINGS.data_dir, "boardviews", "parsed", f"{safe}.{digest}.json")
+
+
+def _read_parse_cache(
+    cache_path: str,
+    mtime_ns: int,
+    size: int,
+) -> Optional[Tuple[set[str], Dict[str, List[Dict[str, Any]]], Dict[str, Any]]]:
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        cached = _load_json(cache_path)
+    except Exception:
+        return None
+    source = cached.get("source") or {}
+    if (
+        source.get("version") != _PARSE_CACHE_VERSION
+        or source.get("mtime_ns") != mtime_ns
+        or source.get("size") != size
+    ):
+        return None
+    return set(cached.get("nets") or []), cached.get("net_to_refs") or {}, cached.get("meta") or {}
+
+
+def _write_parse_cache(
+    cache_path: str,
+    path: str,
+    mtime_ns: int,
+    size: int,
+    result: Tuple[set[str], Dict[str, List[Dict[str, Any]]], Dict[str, Any]],
+) -> None:
+    nets, net_to_refs, meta = result
+    data = {
+        "source": {
+            "path": os.path.abspath(path),
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "version": _PARSE_CACHE_VERSION,
+        },
+        "nets": sorted(nets),
+        "net_to_refs": net_to_refs,
+        "meta": meta,
+    }
+    tmp_path = None
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        # write beside the target and rename, so readers never see a partly written file
+        fd, tmp_path = tempfile.mkstemp(prefix=".parse-", suffix=".tmp", dir=cache_dir)
+        os.close(fd)
+        _dump_json(tmp_path, data)
+        os.replace(tmp_path, cache_path)
+        tmp_path = None
+    except (OSError, TypeError, ValueError):
+        # The parse cache is best-effort; a failed write just means a re-parse next time.
+        pass
+    finally:
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
 def parse_boardview(path: str) -> Tuple[set[str], Dict[str, List[Dict[str, Any]]], Dict[str, Any]]:
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    cached = _PARSE_CACHE.get(key)
+    if cached is not None:
+        return cached
+    cache_path = _parse_cache_path(path)
+    result = _read_parse_cache(cache_path, st.st_mtime_ns, st.st_size)
+    if result is None:
+        result = _parse_boardview_file(path)
+        _write_parse_cache(cache_path, path, st.st_mtime_ns, st.st_size, result)
+    _PARSE_CACHE[key] = result
+    return result
+
+
+def _format_handler(fmt: str) -> Optional[Callable[[str], Any]]:
+    handler = _HANDLERS.get(fmt)
+    if handler is None:
+        spec = _FORMAT_HANDLERS.get(fmt)
+        if spec is None:
+            return None
+        module, attr = spec
+        handler = getattr(importlib.import_module(module, __name__), attr)
+        _HANDLERS[fmt] = handler
+    return handler
+
+
+def _parse_boardview_file(path: str) -> Tuple[set[str], Dict[str, List[Dict[str, Any]]], Dict[str, Any]]:
+    # Map the file instead of reading it: the scanners below only touch a
+    # fraction of large dumps and accept any buffer.
     with open(path, "rb") as f:
-        data = f.read()
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            data = b""
+        try:
+            return _parse_boardview_data(path, data)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+
+def _parse_boardview_data(
+    path: str, data: bytes | mmap.mmap
+) -> Tuple[set[str], Dict[str, List[Dict[str, Any]]], Dict[str, Any]]:
     fmt = detect_boardview_format(path, data)
     if not fmt:
         raise ValueError("unsupported_boardview_format")
-    if fmt == "BVRAW_FORMAT_3":
-        return parse_bvraw_format_3(path)
-    if fmt == "PCB_EMBEDDED_ZLIB":
-        from ..pcb_boardview import parse_pcb_zlib_container
-        return parse_pcb_zlib_container(path)
-    if fmt == "BRD":
-        from .brd_parser import parse_brd
-        return parse_brd(path)
-    if fmt == "XZZPCB":
-        from .xzzpcb_parser import parse_xzzpcb
-        return parse_xzzpcb(path)
-    if fmt == "TVW_STRINGS":
-        from .tvw_parser import parse_tvw
-        return parse_tvw(path)
+    handler = _format_handler(fmt)
+    if handler is not None:
+        return handler(path)
 
     strings = _extract_ascii_strings(data)
     if not strings:
         raise ValueError("no_strings_found")
     strings_map = {off: s for off, s in strings}
-    net_offsets = {off for off, s in strings if _NET_RE.fullmatch(s or "")}
-    ref_offsets = {off for off, s in strings if _REFDES_RE.fullmatch(s or "")}
+    net_offsets: set[int] = set()
+    ref_offsets: set[int] = set()
+    for off, s in strings:
+        m = _NET_OR_REFDES_RE.fullmatch(s)
+        if m is None:
+            continue
+        if m.lastgroup == "net":
+            net_offsets.add(off)
+        else:
+            ref_offsets.add(off)
     if not net_offsets or not ref_offsets:
         raise ValueError("missing_net_or_refdes_strings")
 
@@ -312,6 +501,5 @@ def write_boardview_cache(
         "net_to_refs": net_to_refs,
         "meta": meta,
     }
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    _dump_json(path, data, indent=True)
     return path
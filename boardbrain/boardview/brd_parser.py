@@ -1,16 +1,32 @@
 from __future__ import annotations
 
+import functools
 import os
 from dataclasses import dataclass
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Iterator, List, Tuple
+
+import numpy as np
 
 from ..netlist import canonicalize_net_name
 
 
 BRD_SIGNATURE = bytes([0x23, 0xE2, 0x63, 0x28])
-
-
-@dataclass
+_SIDE_NAMES = {1: "top", 2: "bottom"}
+_SIDE_CODES = {"top": 1, "bottom": 2}
+_BRD_BLOCKS = {
+    "str_length:": 1,
+    "var_data:": 2,
+    "Format:": 3,
+    "format:": 3,
+    "Parts:": 4,
+    "Pins1:": 4,
+    "Pins:": 5,
+    "Pins2:": 5,
+    "Nails:": 6,
+}
+
+
+@dataclass(slots=True)
 class BRDPart:
     name: str
     mounting_side: str
@@ -20,7 +36,7 @@ class BRDPart:
     p2: Tuple[int, int] = (0, 0)
 
 
-@dataclass
+@dataclass(slots=True)
 class BRDPin:
     x: int
     y: int
@@ -30,7 +46,7 @@ class BRDPin:
     side: str = "both"
 
 
-@dataclass
+@dataclass(slots=True)
 class BRDNail:
     probe: int
     x: int
@@ -39,27 +55,29 @@ class BRDNail:
     net: str
 
 
+def _descramble_byte(b: int) -> int:
+    if b in (0x0D, 0x0A, 0x00):
+        return b
+    return ~(((b >> 6) & 3) | ((b << 2) & 0xFF)) & 0xFF
+
+
+_BRD_DECODE_TABLE = bytes(_descramble_byte(b) for b in range(256))
+
+
 def _decode_brd(data: bytes) -> Tuple[bytes, bool]:
     if not data.startswith(BRD_SIGNATURE):
         return data, False
-    out = bytearray(data)
-    for i, b in enumerate(out):
-        if b in (0x0D, 0x0A, 0x00):
-            continue
-        c = b
-        x = ~(((c >> 6) & 3) | ((c << 2) & 0xFF))
-        out[i] = x & 0xFF
-    return bytes(out), True
+    return data.translate(_BRD_DECODE_TABLE), True
 
 
-def _split_lines(data: bytes) -> List[str]:
-    text = data.decode("latin-1", errors="ignore")
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
-    return text.split("\n")
+def _split_lines(data: bytes) -> Iterator[str]:
+    # bytes.splitlines() breaks on \n, \r and \r\n only; lines are decoded one at a time
+    # instead of materializing (and twice rewriting) a decoded copy of the whole file.
+    return (line.decode("latin-1") for line in data.splitlines())
 
 
 def _read_tokens(line: str) -> List[str]:
-    return [t for t in line.strip().split() if t]
+    return line.split()
 
 
 def _parse_brd_file(data: bytes) -> Tuple[List[Tuple[int, int]], List[BRDPart], List[BRDPin], List[BRDNail]]:
@@ -81,23 +99,9 @@ def _parse_brd_file(data: bytes) -> Tuple[List[Tuple[int, int]], List[BRDPart],
         line = raw.lstrip()
         if not line:
             continue
-        if line == "str_length:":
-            current_block = 1
-            continue
-        if line == "var_data:":
-            current_block = 2
-            continue
-        if line in ("Format:", "format:"):
-            current_block = 3
-            continue
-        if line in ("Parts:", "Pins1:"):
-            current_block = 4
-            continue
-        if line in ("Pins:", "Pins2:"):
-            current_block = 5
-            continue
-        if line == "Nails:":
-            current_block = 6
+        block = _BRD_BLOCKS.get(line)
+        if block is not None:
+            current_block = block
             continue
 
         tokens = _read_tokens(line)
@@ -106,14 +110,11 @@ def _parse_brd_file(data: bytes) -> Tuple[List[Tuple[int, int]], List[BRDPart],
         if current_block == 2:
             if len(tokens) < 4:
                 continue
-            num_format = int(tokens[0])
-            num_parts = int(tokens[1])
-            num_pins = int(tokens[2])
-            num_nails = int(tokens[3])
+            num_format, num_parts, num_pins, num_nails = map(int, tokens[:4])
         elif current_block == 3:
             if len(tokens) < 2:
                 continue
-            format_pts.append((int(tokens[0]), int(tokens[1])))
+            format_pts.append(tuple(map(int, tokens[:2])))
         elif current_block == 4:
             if len(tokens) < 3:
                 continue
@@ -130,24 +131,25 @@ def _parse_brd_file(data: bytes) -> Tuple[List[Tuple[int, int]], List[BRDPart],
         elif current_block == 5:
             if len(tokens) < 5:
                 continue
-            x, y, probe, part = int(tokens[0]), int(tokens[1]), int(tokens[2]), int(tokens[3])
+            x, y, probe, part = map(int, tokens[:4])
             net = tokens[4]
             pins.append(BRDPin(x=x, y=y, probe=probe, part=part, net=net))
         elif current_block == 6:
             if len(tokens) < 5:
                 continue
-            probe, x, y, side = int(tokens[0]), int(tokens[1]), int(tokens[2]), int(tokens[3])
+            probe, x, y, side = map(int, tokens[:4])
             net = tokens[4]
             nail_side = "top" if side == 1 else "bottom"
             nails.append(BRDNail(probe=probe, x=x, y=y, side=nail_side, net=net))
 
     nails_to_nets = {n.probe: n.net for n in nails}
+    parts_side = [p.mounting_side for p in parts]
     for pin in pins:
         if not pin.net:
             pin.net = nails_to_nets.get(pin.probe, "")
         idx = pin.part - 1
-        if 0 <= idx < len(parts):
-            pin.side = parts[idx].mounting_side
+        if 0 <= idx < len(parts_side):
+            pin.side = parts_side[idx]
 
     if not format_pts and num_format:
         format_pts = format_pts[:num_format]
@@ -167,8 +169,11 @@ def _parse_brd2_file(data: bytes) -> Tuple[List[Tuple[int, int]], List[BRDPart],
     nets: Dict[int, str] = {}
     format_pts: List[Tuple[int, int]] = []
     parts: List[BRDPart] = []
-    pins: List[BRDPin] = []
     nails: List[BRDNail] = []
+    pin_x: List[int] = []
+    pin_y: List[int] = []
+    pin_net: List[str] = []
+    pin_side: List[int] = []
 
     for raw in lines:
         line = raw.lstrip()
@@ -213,7 +218,7 @@ def _parse_brd2_file(data: bytes) -> Tuple[List[Tuple[int, int]], List[BRDPart],
         if current_block == 1:
             if len(tokens) < 2:
                 continue
-            format_pts.append((int(tokens[0]), int(tokens[1])))
+            format_pts.append(tuple(map(int, tokens[:2])))
         elif current_block == 2:
             if len(tokens) < 2:
                 continue
@@ -222,9 +227,7 @@ def _parse_brd2_file(data: bytes) -> Tuple[List[Tuple[int, int]], List[BRDPart],
             if len(tokens) < 7:
                 continue
             name = tokens[0]
-            p1x, p1y, p2x, p2y = int(tokens[1]), int(tokens[2]), int(tokens[3]), int(tokens[4])
-            end_of_pins = int(tokens[5])
-            side_val = int(tokens[6])
+            p1x, p1y, p2x, p2y, end_of_pins, side_val = map(int, tokens[1:7])
             side = "both"
             if side_val == 1:
                 side = "top"
@@ -243,18 +246,15 @@ def _parse_brd2_file(data: bytes) -> Tuple[List[Tuple[int, int]], List[BRDPart],
         elif current_block == 4:
             if len(tokens) < 4:
                 continue
-            x, y, netid, side_val = int(tokens[0]), int(tokens[1]), int(tokens[2]), int(tokens[3])
-            side = "both"
-            if side_val == 1:
-                side = "top"
-            elif side_val == 2:
-                side = "bottom"
-            net = nets.get(netid, "")
-            pins.append(BRDPin(x=x, y=y, probe=1, part=0, net=net, side=side))
+            x, y, netid, side_val = map(int, tokens[:4])
+            pin_x.append(x)
+            pin_y.append(y)
+            pin_net.append(nets.get(netid, ""))
+            pin_side.append(side_val)
         elif current_block == 5:
             if len(tokens) < 5:
                 continue
-            probe, x, y, netid, is_top = int(tokens[0]), int(tokens[1]), int(tokens[2]), int(tokens[3]), int(tokens[4])
+            probe, x, y, netid, is_top = map(int, tokens[:5])
             net = nets.get(netid, "UNCONNECTED")
             if is_top == 1:
                 side = "top"
@@ -263,31 +263,36 @@ def _parse_brd2_file(data: bytes) -> Tuple[List[Tuple[int, int]], List[BRDPart],
                 y = max_y - y
             nails.append(BRDNail(probe=probe, x=x, y=y, side=side, net=net))
 
-    # assign pins to parts
+    # assign pins to parts; pins are kept as parallel arrays so each part's range is one slice
+    num_pins_read = len(pin_x)
+    side_codes = np.array(pin_side, dtype=np.int64)
+    part_ids = np.zeros(num_pins_read, dtype=np.int64)
     cpi = 0
     for i in range(len(parts)):
         if i == len(parts) - 1:
-            pei = len(pins)
+            pei = num_pins_read
         else:
             pei = parts[i + 1].end_of_pins
-        is_dip = True
         if parts[i].mounting_side == "bottom":
             p1x, p1y = parts[i].p1
             p2x, p2y = parts[i].p2
             parts[i].p1 = (p1x, max_y - p1y)
             parts[i].p2 = (p2x, max_y - p2y)
-        while cpi < pei and cpi < len(pins):
-            pins[cpi].part = i + 1
-            if pins[cpi].side != "top":
-                pins[cpi].y = max_y - pins[cpi].y
-            if (pins[cpi].side == "top" and parts[i].mounting_side == "top") or (
-                pins[cpi].side == "bottom" and parts[i].mounting_side == "bottom"
-            ):
-                is_dip = False
-            cpi += 1
-        if is_dip:
+        end = min(max(pei, cpi), num_pins_read)
+        part_ids[cpi:end] = i + 1
+        part_code = _SIDE_CODES.get(parts[i].mounting_side, 0)
+        if not (part_code and bool(np.any(side_codes[cpi:end] == part_code))):
             parts[i].part_type = "TH"
             parts[i].mounting_side = "both"
+        cpi = end
+    # only pins that were assigned to a part are flipped onto the top-side coordinate system
+    ys = np.array(pin_y, dtype=np.int64)
+    flip = side_codes[:cpi] != 1
+    ys[:cpi][flip] = max_y - ys[:cpi][flip]
+    pins = [
+        BRDPin(x=x, y=y, probe=1, part=part, net=net, side=_SIDE_NAMES.get(side, "both"))
+        for x, y, part, net, side in zip(pin_x, ys.tolist(), part_ids.tolist(), pin_net, pin_side)
+    ]
     # dummy parts for probe points
     parts.append(BRDPart(name="...", mounting_side="bottom", part_type="SMD", end_of_pins=0))
     parts.append(BRDPart(name="...", mounting_side="top", part_type="SMD", end_of_pins=0))
@@ -296,7 +301,9 @@ def _parse_brd2_file(data: bytes) -> Tuple[List[Tuple[int, int]], List[BRDPart],
 
 
 def parse_brd(path: str) -> Tuple[set, Dict[str, List[Dict[str, Any]]], Dict[str, Any]]:
-    data = open(path, "rb").read()
+    # Both layouts decode or split the whole file, so read it in one go (a mapping would be copied anyway).
+    with open(path, "rb") as f:
+        data = f.read()
     if b"BRDOUT:" in data and b"NETS:" in data:
         fmt = "BRD2"
         format_pts, parts, pins, nails = _parse_brd2_file(data)
@@ -308,31 +315,29 @@ def parse_brd(path: str) -> Tuple[set, Dict[str, List[Dict[str, Any]]], Dict[str
     net_to_refs: Dict[str, Dict[str, Dict[str, Any]]] = {}
     part_points: Dict[int, List[Tuple[int, int]]] = {}
 
+    # pins and nails repeat a small set of net names; normalize each once
+    canon = functools.lru_cache(maxsize=None)(canonicalize_net_name)
+    parts_refdes = [p.name.strip() for p in parts]
+    parts_side = [p.mounting_side for p in parts]
+    parts_kind = ["TP" if r.startswith("TP") else ("P" if r.startswith("P") else r[:1]) for r in parts_refdes]
     for pin in pins:
-        net = canonicalize_net_name(pin.net or "")
+        net = canon(pin.net or "")
         if not net or net.startswith("UNCONNECTED"):
             continue
         nets.add(net)
         idx = pin.part - 1
-        if 0 <= idx < len(parts):
-            refdes = parts[idx].name.strip()
+        if 0 <= idx < len(parts_refdes):
+            refdes = parts_refdes[idx]
             if refdes and refdes != "...":
-                kind = "TP" if refdes.startswith("TP") else ("P" if refdes.startswith("P") else refdes[:1])
-                net_to_refs.setdefault(net, {})
-                net_to_refs[net].setdefault(
-                    refdes,
-                    {
-                        "refdes": refdes,
-                        "kind": kind,
-                        "side": parts[idx].mounting_side,
-                    },
-                )
+                refs = net_to_refs.setdefault(net, {})
+                if refdes not in refs:
+                    refs[refdes] = {"refdes": refdes, "kind": parts_kind[idx], "side": parts_side[idx]}
             part_points.setdefault(idx, []).append((pin.x, pin.y))
 
     # include nail nets
     testpoints: List[Dict[str, Any]] = []
     for nail in nails:
-        net = canonicalize_net_name(nail.net or "")
+        net = canon(nail.net or "")
         if net and not net.startswith("UNCONNECTED"):
             nets.add(net)
         testpoints.append(
@@ -348,7 +353,7 @@ def parse_brd(path: str) -> Tuple[set, Dict[str, List[Dict[str, Any]]], Dict[str
     # components list
     components: List[Dict[str, Any]] = []
     for idx, part in enumerate(parts):
-        refdes = part.name.strip()
+        refdes = parts_refdes[idx]
         if not refdes or refdes == "...":
             continue
         if part.p1 != (0, 0) or part.p2 != (0, 0):
@@ -393,11 +398,19 @@ def parse_brd(path: str) -> Tuple[set, Dict[str, List[Dict[str, Any]]], Dict[str
 def _compute_bounds(points: List[Tuple[int, int]]) -> Dict[str, int]:
     if not points:
         return {"min_x": 0, "min_y": 0, "max_x": 0, "max_y": 0}
-    xs = [p[0] for p in points]
-    ys = [p[1] for p in points]
+    min_x, min_y = max_x, max_y = points[0]
+    for x, y in points:
+        if x < min_x:
+            min_x = x
+        elif x > max_x:
+            max_x = x
+        if y < min_y:
+            min_y = y
+        elif y > max_y:
+            max_y = y
     return {
-        "min_x": min(xs),
-        "min_y": min(ys),
-        "max_x": max(xs),
-        "max_y": max(ys),
+        "min_x": min_x,
+        "min_y": min_y,
+        "max_x": max_x,
+        "max_y": max_y,
     }
@@ -163,8 +163,7 @@ def _feistel(r: int, subkey: int) -> int:
     return _permute(s, P, 32)
 
 
-def des_decrypt_block(block: int, key: int) -> int:
-    subkeys = _generate_subkeys(key)
+def _decrypt_with_subkeys(block: int, subkeys: list[int]) -> int:
     # initial permutation
     ip = _permute(block, IP, 64)
     l = (ip >> 32) & 0xFFFFFFFF
@@ -173,3 +172,20 @@ def des_decrypt_block(block: int, key: int) -> int:
         l, r = r, l ^ _feistel(r, subkeys[i])
     preoutput = (r << 32) | l
     return _permute(preoutput, FP, 64)
+
+
+def des_decrypt_block(block: int, key: int) -> int:
+    return _decrypt_with_subkeys(block, _generate_subkeys(key))
+
+
+def des_decrypt_ecb(data: bytes, key: int) -> bytes:
+    """Decrypt data in ECB mode, zero-padding a short final block; the key schedule is built once."""
+    subkeys = _generate_subkeys(key)
+    pad = (-len(data)) % 8
+    if pad:
+        data = bytes(data) + b"\x00" * pad
+    out = bytearray(len(data))
+    for i in range(0, len(data), 8):
+        val = int.from_bytes(data[i : i + 8], "big", signed=False)
+        out[i : i + 8] = _decrypt_with_subkeys(val, subkeys).to_bytes(8, "big", signed=False)
+    return bytes(out)
@@ -3,6 +3,8 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -34,41 +36,50 @@ def probe(path: str, out_dir: str | None, top: int, max_candidates: int, dense:
         dense=dense,
     )
     chunks_sorted = sorted(chunks, key=lambda c: c.get("score", 0), reverse=True)
-    print(f"[probe] candidates: {len(candidates)}")
-    print(f"[probe] decompressed chunks: {len(chunks)}")
+    lines = [
+        f"[probe] candidates: {len(candidates)}",
+        f"[probe] decompressed chunks: {len(chunks)}",
+    ]
     if not chunks:
         from ..pcb_boardview import _extract_ascii_strings, _NET_RE, _REFDES_RE
         strings = _extract_ascii_strings(data)
         nets = [s for _, s in strings if _NET_RE.fullmatch(s or "")]
         refs = [s for _, s in strings if _REFDES_RE.fullmatch(s or "")]
-        print(f"[probe] null-terminated strings: {len(strings)}")
-        print(f"[probe] net strings: {len(nets)} refdes strings: {len(refs)}")
+        lines.append(f"[probe] null-terminated strings: {len(strings)}")
+        lines.append(f"[probe] net strings: {len(nets)} refdes strings: {len(refs)}")
         if nets:
-            print("[probe] sample nets:", ", ".join(sorted(set(nets))[:10]))
+            lines.append("[probe] sample nets: " + ", ".join(sorted(set(nets))[:10]))
         if refs:
-            print("[probe] sample refdes:", ", ".join(sorted(set(refs))[:10]))
-    print("")
-    print("Rank | Method | Offset | OutLen | Printable | Score | Markers")
-    print("-----+--------+--------+--------+-----------+-------+--------")
+            lines.append("[probe] sample refdes: " + ", ".join(sorted(set(refs))[:10]))
+    lines.append("")
+    lines.append("Rank | Method | Offset | OutLen | Printable | Score | Markers")
+    lines.append("-----+--------+--------+--------+-----------+-------+--------")
     for idx, ch in enumerate(chunks_sorted[:top], start=1):
         markers = ",".join(sorted(ch.get("marker_hits", {}).keys()))
-        print(
+        lines.append(
             f"{idx:>4} | {ch['method']:<6} | {ch['offset']:<6} | {ch['decompressed_len']:<6} "
             f"| {ch.get('printable_ratio', 0):<9} | {ch.get('score', 0):<5} | {markers}"
         )
-    print("")
+    lines.append("")
     if chunks_sorted:
         best = chunks_sorted[0]
-        print("[probe] best preview:")
-        print(best.get("preview", ""))
+        lines.append("[probe] best preview:")
+        lines.append(best.get("preview", ""))
+    # one write instead of a print (and stdout lock round-trip) per table row
+    sys.stdout.write("\n".join(lines) + "\n")
 
     if out_dir:
         out_path = Path(out_dir)
         out_path.mkdir(parents=True, exist_ok=True)
+        jobs = []
         for idx, ch in enumerate(chunks_sorted[:top], start=1):
             suffix = "txt" if ch.get("likely_text") else "bin"
             name = f"chunk_{idx:02d}_{ch['method']}_0x{ch['offset']:x}.{suffix}"
-            _write_payload(out_path / name, ch)
+            jobs.append((out_path / name, ch))
+        if jobs:
+            # independent files; overlap the writes
+            with ThreadPoolExecutor(max_workers=min(8, len(jobs))) as pool:
+                list(pool.map(lambda job: _write_payload(*job), jobs))
         summary = {
             "path": str(src),
             "file_size": len(data),
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import functools
+import mmap
 import re
 from typing import Dict, Any, List, Tuple
 
+import numpy as np
+
 from ..netlist import canonicalize_net_name
 
 _NET_RE = re.compile(
@@ -54,47 +58,57 @@ _NET_DENY_SUBSTR = (
     "FUSE",
 )
 _NET_DENY_PREFIX = re.compile(r"^[CRLDUQFPJ][0-9]{3,}_", re.IGNORECASE)
-
-
-def _extract_strings(data: bytes, min_len: int = 3) -> List[str]:
-    out = []
-    buf: List[int] = []
-    for b in data:
-        if 32 <= b <= 126:
-            buf.append(b)
-        else:
-            if len(buf) >= min_len:
-                out.append(bytes(buf).decode("ascii", errors="ignore"))
-            buf = []
-    if len(buf) >= min_len:
-        out.append(bytes(buf).decode("ascii", errors="ignore"))
-    return out
-
-
-def _extract_null_strings(data: bytes, min_len: int = 3) -> List[str]:
-    out = []
-    buf: List[int] = []
-    for b in data:
-        if 32 <= b <= 126:
-            buf.append(b)
-        else:
-            if b == 0 and len(buf) >= min_len:
-                out.append(bytes(buf).decode("ascii", errors="ignore"))
-            buf = []
-    return out
+# Bound once: the classifiers below run for every string extracted from the file.
+_match_net = _NET_RE.match
+_match_refdes = _REFDES_RE.match
+_match_deny_prefix = _NET_DENY_PREFIX.match
+_search_deny_substr = re.compile("|".join(map(re.escape, _NET_DENY_SUBSTR))).search
+_DIGIT_DELETE = str.maketrans("", "", "0123456789")
+# Cheap rejects ahead of _NET_RE: every alternative starts with A-Z or 0-9, and the only
+# alternatives that can match without an underscore start with one of these prefixes.
+_NET_FIRST_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+_NET_BARE_PREFIXES = ("PP", "GND", "GROUND", "VBUS", "VBAT", "VDD", "VCC")
+
+
+def _printable_runs(data: bytes, min_len: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the byte view plus (start, end) offsets of printable ASCII runs of at least min_len."""
+    arr = np.frombuffer(data, dtype=np.uint8)
+    printable = ((arr >= 32) & (arr <= 126)).view(np.int8)
+    edges = np.diff(printable, prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    keep = (ends - starts) >= min_len
+    return arr, starts[keep], ends[keep]
+
+
+def _extract_strings(data: bytes, min_len: int = 3) -> Tuple[List[str], List[str]]:
+    """Return all printable runs and the subset terminated by a NUL byte."""
+    arr, starts, ends = _printable_runs(data, min_len)
+    # runs are pure ASCII, so slicing one latin-1 decode avoids a bytes object per string
+    text = str(data, "latin-1")
+    strings = [text[a:b] for a, b in zip(starts.tolist(), ends.tolist())]
+    inside = ends < len(arr)
+    terminated = np.zeros(len(ends), dtype=bool)
+    terminated[inside] = arr[ends[inside]] == 0
+    null_strings = [s for s, t in zip(strings, terminated.tolist()) if t]
+    return strings, null_strings
 
 
 def _looks_like_net(token: str) -> bool:
-    if not _NET_RE.match(token or ""):
+    if not token or token[0] not in _NET_FIRST_CHARS:
+        return False
+    if "_" not in token and not token.startswith(_NET_BARE_PREFIXES):
+        return False
+    if not _match_net(token):
         return False
     if "\\" in token or ":" in token:
         return False
     upper = token.upper()
-    if any(s in upper for s in _NET_DENY_SUBSTR):
+    if _search_deny_substr(upper):
         return False
-    if _NET_DENY_PREFIX.match(token):
+    if _match_deny_prefix(token):
         return False
-    if sum(ch.isdigit() for ch in token) >= 6 and not token.startswith(("PP", "VDD", "VCC", "VBUS", "VBAT")):
+    if len(token) - len(token.translate(_DIGIT_DELETE)) >= 6 and not token.startswith(("PP", "VDD", "VCC", "VBUS", "VBAT")):
         return False
     return True
 
@@ -102,29 +116,42 @@ def _looks_like_net(token: str) -> bool:
 def _looks_like_refdes(token: str) -> bool:
     if "_" in token:
         return False
-    return bool(_REFDES_RE.match(token or ""))
+    return bool(_match_refdes(token or ""))
 
 
 def parse_tvw(path: str) -> Tuple[set[str], Dict[str, List[Dict[str, Any]]], Dict[str, Any]]:
-    data = open(path, "rb").read()
-
-    strings = _extract_strings(data, min_len=3)
-    null_strings = _extract_null_strings(data, min_len=3)
-
-    nets = {canonicalize_net_name(s) for s in strings if _looks_like_net(s)}
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            data = b""
+        try:
+            strings, null_strings = _extract_strings(data, min_len=3)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    looks_like_net = _looks_like_net
+    looks_like_refdes = _looks_like_refdes
+    canon = functools.lru_cache(maxsize=None)(canonicalize_net_name)
+    nets = {canon(s) for s in strings if looks_like_net(s)}
     nets = {n for n in nets if n}
 
-    components = {s.upper() for s in strings if _looks_like_refdes(s)}
+    components = {s.upper() for s in strings if looks_like_refdes(s)}
 
     net_to_refs: Dict[str, Dict[str, Dict[str, Any]]] = {}
     # Attempt minimal mapping from adjacent null-terminated strings, if any.
-    for a, b in zip(null_strings, null_strings[1:]):
-        if _looks_like_net(a) and _looks_like_refdes(b):
-            net = canonicalize_net_name(a)
-            ref = b.upper()
-        elif _looks_like_refdes(a) and _looks_like_net(b):
-            net = canonicalize_net_name(b)
-            ref = a.upper()
+    # Classify each string once; every string is checked as both left and right neighbour.
+    is_net = [looks_like_net(t) for t in null_strings]
+    is_ref = [looks_like_refdes(t) for t in null_strings]
+    for i in range(len(null_strings) - 1):
+        if is_net[i] and is_ref[i + 1]:
+            net = canon(null_strings[i])
+            ref = null_strings[i + 1].upper()
+        elif is_ref[i] and is_net[i + 1]:
+            net = canon(null_strings[i + 1])
+            ref = null_strings[i].upper()
         else:
             continue
         if not net or not ref:
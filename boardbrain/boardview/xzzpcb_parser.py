@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import functools
+import mmap
 import os
 import re
-from typing import Dict, Any, List, Tuple
+import struct
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
 
 from ..netlist import canonicalize_net_name
-from .des import des_decrypt_block
+from .des import des_decrypt_ecb
 
 try:
     from Crypto.Cipher import DES as _DES
@@ -15,27 +21,32 @@ except Exception:
 XZZ_GLOBAL_SCALE = 10000
 XZZ_MAGIC = b"XZZPCB"
 XZZ_MARKER = b"v6v6555v6v6"
+_XZZ_MAGIC_INT = int.from_bytes(XZZ_MAGIC, "little")
+_unpack_u32 = struct.Struct("<I").unpack_from
+_unpack_net_header = struct.Struct("<II").unpack_from
+# main and net data offsets at 0x20 and 0x28
+_unpack_offsets = struct.Struct("<I4xI").unpack_from
+# ECB cipher objects carry no chaining state, so one per key is reused across blocks and files.
+_DES_CIPHERS: Dict[int, Any] = {}
 XZZ_MASTER_KEY = 0xDCFC12AC00000000
-_REFDES_RE = re.compile(r"^(?:TP[0-9A-Z]+|FB\\d{1,5}|[A-Z]{1,3}\\d{1,5})(?:_[0-9]+)?$", re.IGNORECASE)
+_REFDES_RE = re.compile(r"(?:TP[0-9A-Z]+|FB\d{1,5}|[A-Z]{1,3}\d{1,5})(?:_[0-9]+)?", re.IGNORECASE)
+_fullmatch_refdes = _REFDES_RE.fullmatch
 
 
 def _read_u32(buf: bytes, pos: int) -> int:
     if pos + 4 > len(buf):
         return 0
-    return int.from_bytes(buf[pos : pos + 4], "little", signed=False)
+    if pos < 0:
+        return int.from_bytes(buf[pos : pos + 4], "little", signed=False)
+    return _unpack_u32(buf, pos)[0]
 
 
 def _key_parity_ok(key: int) -> bool:
-    parity = [1, 1, 1, 1, 1, 1, 1, 0]
-    for i in range(8):
-        tmp = (key >> (i * 8)) & 0xFF
-        tmp ^= tmp >> 4
-        tmp ^= tmp >> 2
-        tmp ^= tmp >> 1
-        tmp = (~tmp) & 1
-        if tmp != parity[i]:
-            return False
-    return True
+    # fold each byte's parity into its low bit; bytes 0-6 must have even parity, byte 7 odd
+    x = key ^ (key >> 4)
+    x ^= x >> 2
+    x ^= x >> 1
+    return (~x) & 0x0101010101010101 == 0x0001010101010101
 
 
 def _load_xzzpcb_key() -> Tuple[int, str]:
@@ -66,96 +77,121 @@ def _load_xzzpcb_key() -> Tuple[int, str]:
     return 0, "missing"
 
 
+def _resolve_xzzpcb_key() -> Tuple[int, str]:
+    key, key_source = _load_xzzpcb_key()
+    if not _key_parity_ok(key):
+        key = XZZ_MASTER_KEY
+        key_source = "master_key"
+    if not _key_parity_ok(key):
+        raise ValueError("xzzpcb_missing_or_invalid_key")
+    return key, key_source
+
+
 def verify_xzzpcb(buf: bytes) -> bool:
     if len(buf) < 6:
         return False
     if buf[:6] == XZZ_MAGIC:
         return True
     if len(buf) > 0x10 and buf[0x10] != 0x00:
-        xor_key = buf[0x10]
-        head = bytes([b ^ xor_key for b in buf[:6]])
-        return head == XZZ_MAGIC
+        # XOR all six header bytes at once by broadcasting the key across a 48-bit word
+        return int.from_bytes(buf[:6], "little") ^ (buf[0x10] * 0x010101010101) == _XZZ_MAGIC_INT
     return False
 
 
+def _find_marker(buf: bytes, xor_key: int) -> int:
+    """Locate the end of the XOR-obfuscated region, searching past the main and net blocks first."""
+    mask = xor_key * 0x01010101
+
+    def peek(pos: int) -> int:
+        if pos + 4 > len(buf):
+            return 0
+        return _unpack_u32(buf, pos)[0] ^ mask
+
+    main_start = peek(0x20) + 0x20
+    net_start = peek(0x28) + 0x20
+    search_start = min(len(buf), max(main_start + 4 + peek(main_start), net_start + 4 + peek(net_start)))
+    pos = buf.find(XZZ_MARKER, search_start)
+    if pos == -1:
+        pos = buf.find(XZZ_MARKER, 0, search_start + len(XZZ_MARKER) - 1)
+    return len(buf) if pos == -1 else pos
+
+
 def _des_decrypt_bytes(data: bytes, key: int) -> bytes:
     if _DES is not None:
-        key_bytes = key.to_bytes(8, "big", signed=False)
-        cipher = _DES.new(key_bytes, _DES.MODE_ECB)
-        out = bytearray(len(data))
-        for i in range(0, len(data), 8):
-            block = data[i : i + 8]
-            if len(block) < 8:
-                block = block.ljust(8, b"\x00")
-            dec = cipher.decrypt(block)
-            out[i : i + 8] = dec
-        return bytes(out)
-    out = bytearray(len(data))
-    for i in range(0, len(data), 8):
-        block = data[i : i + 8]
-        if len(block) < 8:
-            block = block.ljust(8, b"\x00")
-        val = int.from_bytes(block, "big", signed=False)
-        dec = des_decrypt_block(val, key)
-        out[i : i + 8] = dec.to_bytes(8, "big", signed=False)
-    return bytes(out)
-
-
-def _translate_points(points: List[Tuple[int, int]], dx: int, dy: int) -> List[Tuple[int, int]]:
-    return [(x - dx, y - dy) for x, y in points]
-
-
-def _find_translation(outline: List[Tuple[Tuple[int, int], Tuple[int, int]]]) -> Tuple[int, int]:
-    if not outline:
+        cipher = _DES_CIPHERS.get(key)
+        if cipher is None:
+            cipher = _DES.new(key.to_bytes(8, "big", signed=False), _DES.MODE_ECB)
+            _DES_CIPHERS[key] = cipher
+        # ECB is stateless, so the whole buffer decrypts in one call; like the per-block loop it
+        # replaced, a short final block is zero-padded and its full 8 decrypted bytes are kept
+        pad = (-len(data)) % 8
+        if pad:
+            data = bytes(data) + b"\x00" * pad
+        return cipher.decrypt(data)
+    return des_decrypt_ecb(data, key)
+
+
+def _translate_points(points: np.ndarray, dx: int, dy: int) -> np.ndarray:
+    """Shift an (..., 2) array of x/y coordinates by (-dx, -dy)."""
+    points = np.asarray(points, dtype=np.int64)
+    return points - np.array((dx, dy), dtype=points.dtype)
+
+
+def _find_translation(outline: np.ndarray) -> Tuple[int, int]:
+    if not len(outline):
         return 0, 0
-    min_x = outline[0][0][0]
-    min_y = outline[0][0][1]
-    for a, b in outline:
-        min_x = min(min_x, a[0], b[0])
-        min_y = min(min_y, a[1], b[1])
+    min_x, min_y = np.asarray(outline).reshape(-1, 2).min(axis=0).tolist()
     return min_x, min_y
 
 
 def _parse_net_block(buf: bytes) -> Dict[int, str]:
     net_dict: Dict[int, str] = {}
+    # latin-1 maps bytes 1:1 to code points, so one decode can be sliced per record
+    text = str(buf, "latin-1")
+    size = len(buf)
     ptr = 0
-    while ptr + 8 <= len(buf):
-        net_size = _read_u32(buf, ptr)
-        ptr += 4
-        net_idx = _read_u32(buf, ptr)
-        ptr += 4
-        if net_size < 8 or ptr + (net_size - 8) > len(buf):
+    while ptr + 8 <= size:
+        net_size, net_idx = _unpack_net_header(buf, ptr)
+        ptr += 8
+        if net_size < 8 or ptr + (net_size - 8) > size:
             break
-        name = buf[ptr : ptr + net_size - 8].decode("latin-1", errors="ignore")
+        net_dict[net_idx] = text[ptr : ptr + net_size - 8]
         ptr += net_size - 8
-        net_dict[net_idx] = name
     return net_dict
 
 
 def parse_xzzpcb(path: str) -> Tuple[set, Dict[str, List[Dict[str, Any]]], Dict[str, Any]]:
-    buf = open(path, "rb").read()
+    with open(path, "rb") as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            buf = b""
+        try:
+            return _parse_xzzpcb_data(buf)
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+
+
+def _parse_xzzpcb_data(buf: bytes | mmap.mmap) -> Tuple[set, Dict[str, List[Dict[str, Any]]], Dict[str, Any]]:
     if not verify_xzzpcb(buf):
         raise ValueError("unsupported_format")
 
-    key, key_source = _load_xzzpcb_key()
-    if not _key_parity_ok(key):
-        key = XZZ_MASTER_KEY
-        key_source = "master_key"
-    if not _key_parity_ok(key):
-        raise ValueError("xzzpcb_missing_or_invalid_key")
-
-    marker_pos = buf.find(XZZ_MARKER)
-    if marker_pos == -1:
-        marker_pos = len(buf)
+    # The DES key is only needed for part blocks; files without them never resolve it.
+    key: Optional[int] = None
+    key_source: Optional[str] = None
     if len(buf) > 0x10 and buf[0x10] != 0x00:
         xor_key = buf[0x10]
-        header = bytearray(buf)
-        for i in range(0, marker_pos):
-            header[i] ^= xor_key
-        buf = bytes(header)
-
-    main_data_offset = _read_u32(buf, 0x20)
-    net_data_offset = _read_u32(buf, 0x28)
+        marker_pos = _find_marker(buf, xor_key)
+        table = bytes(b ^ xor_key for b in range(256))
+        buf = buf[:marker_pos].translate(table) + buf[marker_pos:]
+
+    if len(buf) >= 0x2C:
+        main_data_offset, net_data_offset = _unpack_offsets(buf, 0x20)
+    else:
+        main_data_offset = _read_u32(buf, 0x20)
+        net_data_offset = _read_u32(buf, 0x28)
     main_data_start = main_data_offset + 0x20
     net_data_start = net_data_offset + 0x20
     main_block_size = _read_u32(buf, main_data_start)
@@ -173,164 +209,178 @@ def parse_xzzpcb(path: str) -> Tuple[set, Dict[str, List[Dict[str, Any]]], Dict[
 
     ptr = main_data_start + 4
     end = main_data_start + 4 + main_block_size
-    while ptr < end:
-        block_type = buf[ptr]
-        ptr += 1
-        block_size = _read_u32(buf, ptr)
-        ptr += 4
-        if ptr + block_size > len(buf):
-            break
-        block = buf[ptr : ptr + block_size]
-        ptr += block_size
-
-        if block_type == 0x01:
-            layer = _read_u32(block, 0)
-            if layer != 28:
-                continue
-            x = _read_u32(block, 4) // XZZ_GLOBAL_SCALE
-            y = _read_u32(block, 8) // XZZ_GLOBAL_SCALE
-            r = _read_u32(block, 12) // XZZ_GLOBAL_SCALE
-            start = _read_u32(block, 16) // XZZ_GLOBAL_SCALE
-            end_ang = _read_u32(block, 20) // XZZ_GLOBAL_SCALE
-            # approximate with small segments
-            # Simplified: only store center points as outline if arc
-            outline_segments.append(((x - r, y), (x + r, y)))
-        elif block_type == 0x05:
-            layer = _read_u32(block, 0)
-            if layer != 28:
-                continue
-            x1 = _read_u32(block, 4) // XZZ_GLOBAL_SCALE
-            y1 = _read_u32(block, 8) // XZZ_GLOBAL_SCALE
-            x2 = _read_u32(block, 12) // XZZ_GLOBAL_SCALE
-            y2 = _read_u32(block, 16) // XZZ_GLOBAL_SCALE
-            outline_segments.append(((x1, y1), (x2, y2)))
-        elif block_type == 0x07:
-            dec = _des_decrypt_bytes(block, key)
-            # parse part block
-            cur = 0
-            part_size = _read_u32(dec, cur)
-            cur += 4
-            cur += 18
-            group_name_size = _read_u32(dec, cur)
-            cur += 4 + group_name_size
-            if cur >= len(dec) or dec[cur] != 0x06:
-                continue
-            cur += 31
-            part_name_size = _read_u32(dec, cur)
-            cur += 4
-            part_name = dec[cur : cur + part_name_size].decode("latin-1", errors="ignore")
-            cur += part_name_size
-            part_index = len(parts) + 1
-            parts.append(
-                {
-                    "name": part_name,
-                    "side": "top",
-                    "type": "SMD",
-                    "end_of_pins": 0,
-                }
-            )
-            while cur < part_size + 4 and cur < len(dec):
-                subtype = dec[cur]
-                cur += 1
-                if subtype in (0x01, 0x05, 0x06):
-                    skip = _read_u32(dec, cur)
-                    cur += 4 + skip
-                elif subtype == 0x09:
-                    pin_block_size = _read_u32(dec, cur)
-                    block_end = cur + pin_block_size + 4
-                    cur += 4
-                    cur += 4
-                    x_origin = _read_u32(dec, cur)
-                    cur += 4
-                    y_origin = _read_u32(dec, cur)
-                    cur += 4
-                    cur += 8
-                    pin_name_size = _read_u32(dec, cur)
-                    cur += 4
-                    pin_name = dec[cur : cur + pin_name_size].decode("latin-1", errors="ignore")
-                    cur += pin_name_size
-                    cur += 32
-                    net_index = _read_u32(dec, cur)
-                    cur = block_end
-                    net_name = net_dict.get(net_index, "")
-                    if net_name == "NC":
-                        net_name = "UNCONNECTED"
-                    pins.append(
-                        {
-                            "x": x_origin // XZZ_GLOBAL_SCALE,
-                            "y": y_origin // XZZ_GLOBAL_SCALE,
-                            "name": pin_name,
-                            "part": part_index,
-                            "net": net_name,
-                            "side": "top",
-                        }
-                    )
-                else:
-                    # unknown sub block
+    # Blocks are zero-copy views into buf; they are released before returning so an mmap
+    # backing buf can be closed even when parsing raises.
+    mv = memoryview(buf)
+    block = mv
+    try:
+        while ptr < end:
+            block_type = buf[ptr]
+            ptr += 1
+            block_size = _read_u32(buf, ptr)
+            ptr += 4
+            if ptr + block_size > len(buf):
+                break
+            block = mv[ptr : ptr + block_size]
+            ptr += block_size
+
+            if block_type == 0x01:
+                layer = _read_u32(block, 0)
+                if layer != 28:
                     continue
-            parts[-1]["end_of_pins"] = len(pins)
-        elif block_type == 0x09:
-            cur = 0
-            cur += 4
-            x_origin = _read_u32(block, cur)
-            cur += 4
-            y_origin = _read_u32(block, cur)
-            cur += 4
-            cur += 8
-            name_length = _read_u32(block, cur)
-            cur += 4
-            name = block[cur : cur + name_length].decode("latin-1", errors="ignore")
-            net_index = _read_u32(block, len(block) - 4)
-            net_name = net_dict.get(net_index, "")
-            if net_name in ("UNCONNECTED", "NC"):
-                net_name = ""
-            tp_name = name
-            if tp_name and not tp_name[0].isalpha():
-                tp_name = f"TP{tp_name}"
-            testpads.append(
-                {
-                    "name": tp_name,
-                    "x": x_origin // XZZ_GLOBAL_SCALE,
-                    "y": y_origin // XZZ_GLOBAL_SCALE,
-                    "net": net_name,
-                    "side": "top",
-                }
-            )
-            parts.append(
-                {
-                    "name": f"...{tp_name}",
-                    "side": "top",
-                    "type": "TP",
-                    "end_of_pins": 0,
-                }
-            )
-            pins.append(
-                {
-                    "x": x_origin // XZZ_GLOBAL_SCALE,
-                    "y": y_origin // XZZ_GLOBAL_SCALE,
-                    "name": tp_name,
-                    "part": len(parts),
-                    "net": net_name,
-                    "side": "top",
-                }
-            )
-            parts[-1]["end_of_pins"] = len(pins)
-
-    dx, dy = _find_translation(outline_segments)
+                x = _read_u32(block, 4) // XZZ_GLOBAL_SCALE
+                y = _read_u32(block, 8) // XZZ_GLOBAL_SCALE
+                r = _read_u32(block, 12) // XZZ_GLOBAL_SCALE
+                start = _read_u32(block, 16) // XZZ_GLOBAL_SCALE
+                end_ang = _read_u32(block, 20) // XZZ_GLOBAL_SCALE
+                # approximate with small segments
+                # Simplified: only store center points as outline if arc
+                outline_segments.append(((x - r, y), (x + r, y)))
+            elif block_type == 0x05:
+                layer = _read_u32(block, 0)
+                if layer != 28:
+                    continue
+                x1 = _read_u32(block, 4) // XZZ_GLOBAL_SCALE
+                y1 = _read_u32(block, 8) // XZZ_GLOBAL_SCALE
+                x2 = _read_u32(block, 12) // XZZ_GLOBAL_SCALE
+                y2 = _read_u32(block, 16) // XZZ_GLOBAL_SCALE
+                outline_segments.append(((x1, y1), (x2, y2)))
+            elif block_type == 0x07:
+                if key is None:
+                    key, key_source = _resolve_xzzpcb_key()
+                dec = _des_decrypt_bytes(block, key)
+                # parse part block
+                cur = 0
+                part_size = _read_u32(dec, cur)
+                cur += 4
+                cur += 18
+                group_name_size = _read_u32(dec, cur)
+                cur += 4 + group_name_size
+                if cur >= len(dec) or dec[cur] != 0x06:
+                    continue
+                cur += 31
+                part_name_size = _read_u32(dec, cur)
+                cur += 4
+                part_name = dec[cur : cur + part_name_size].decode("latin-1")
+                cur += part_name_size
+                part_index = len(parts) + 1
+                parts.append(
+                    {
+                        "name": part_name,
+                        "side": "top",
+                        "type": "SMD",
+                        "end_of_pins": 0,
+                    }
+                )
+                while cur < part_size + 4 and cur < len(dec):
+                    subtype = dec[cur]
+                    cur += 1
+                    if subtype in (0x01, 0x05, 0x06):
+                        skip = _read_u32(dec, cur)
+                        cur += 4 + skip
+                    elif subtype == 0x09:
+                        pin_block_size = _read_u32(dec, cur)
+                        block_end = cur + pin_block_size + 4
+                        cur += 4
+                        cur += 4
+                        x_origin = _read_u32(dec, cur)
+                        cur += 4
+                        y_origin = _read_u32(dec, cur)
+                        cur += 4
+                        cur += 8
+                        pin_name_size = _read_u32(dec, cur)
+                        cur += 4
+                        pin_name = dec[cur : cur + pin_name_size].decode("latin-1")
+                        cur += pin_name_size
+                        cur += 32
+                        net_index = _read_u32(dec, cur)
+                        cur = block_end
+                        net_name = net_dict.get(net_index, "")
+                        if net_name == "NC":
+                            net_name = "UNCONNECTED"
+                        pins.append(
+                            {
+                                "x": x_origin // XZZ_GLOBAL_SCALE,
+                                "y": y_origin // XZZ_GLOBAL_SCALE,
+                                "name": pin_name,
+                                "part": part_index,
+                                "net": net_name,
+                                "side": "top",
+                            }
+                        )
+                    else:
+                        # unknown sub block
+                        continue
+                parts[-1]["end_of_pins"] = len(pins)
+            elif block_type == 0x09:
+                cur = 0
+                cur += 4
+                x_origin = _read_u32(block, cur)
+                cur += 4
+                y_origin = _read_u32(block, cur)
+                cur += 4
+                cur += 8
+                name_length = _read_u32(block, cur)
+                cur += 4
+                name = str(block[cur : cur + name_length], "latin-1")
+                net_index = _read_u32(block, len(block) - 4)
+                net_name = net_dict.get(net_index, "")
+                if net_name in ("UNCONNECTED", "NC"):
+                    net_name = ""
+                tp_name = name
+                if tp_name and not tp_name[0].isalpha():
+                    tp_name = f"TP{tp_name}"
+                testpads.append(
+                    {
+                        "name": tp_name,
+                        "x": x_origin // XZZ_GLOBAL_SCALE,
+                        "y": y_origin // XZZ_GLOBAL_SCALE,
+                        "net": net_name,
+                        "side": "top",
+                    }
+                )
+                parts.append(
+                    {
+                        "name": f"...{tp_name}",
+                        "side": "top",
+                        "type": "TP",
+                        "end_of_pins": 0,
+                    }
+                )
+                pins.append(
+                    {
+                        "x": x_origin // XZZ_GLOBAL_SCALE,
+                        "y": y_origin // XZZ_GLOBAL_SCALE,
+                        "name": tp_name,
+                        "part": len(parts),
+                        "net": net_name,
+                        "side": "top",
+                    }
+                )
+                parts[-1]["end_of_pins"] = len(pins)
+    finally:
+        block.release()
+        mv.release()
+
+    # Outline and pin coordinates are rebased where they are consumed below rather than in a
+    # separate pass; only the testpads, which are returned as-is, are shifted here.
+    outline = np.asarray(outline_segments, dtype=np.int64).reshape(-1, 2, 2)
+    dx, dy = _find_translation(outline)
     if dx or dy:
-        outline_segments = [((a[0] - dx, a[1] - dy), (b[0] - dx, b[1] - dy)) for a, b in outline_segments]
-        for p in pins:
-            p["x"] -= dx
-            p["y"] -= dy
         for t in testpads:
             t["x"] -= dx
             t["y"] -= dy
 
-    nets: set = set(canonicalize_net_name(n) for n in net_dict.values() if canonicalize_net_name(n))
-    net_to_refs: Dict[str, Dict[str, Dict[str, Any]]] = {}
-    part_points: Dict[int, List[Tuple[int, int]]] = {}
+    canon = functools.lru_cache(maxsize=None)(canonicalize_net_name)
+    nets: set = {c for c in map(canon, net_dict.values()) if c}
+    seen_pairs: set[Tuple[str, str]] = set()
+    net_to_refs: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    # pin coordinates per owning part, kept as parallel columns for the centroid reduction
+    pt_part: List[int] = []
+    pt_x: List[int] = []
+    pt_y: List[int] = []
     for pin in pins:
-        net = canonicalize_net_name(pin.get("net") or "")
+        net = canon(pin.get("net") or "")
         if not net or net.startswith("UNCONNECTED"):
             continue
         nets.add(net)
@@ -338,25 +388,27 @@ def parse_xzzpcb(path: str) -> Tuple[set, Dict[str, List[Dict[str, Any]]], Dict[
         refdes = ""
         if 0 <= part_idx < len(parts):
             refdes = parts[part_idx]["name"]
-            part_points.setdefault(part_idx, []).append((pin["x"], pin["y"]))
+            pt_part.append(part_idx)
+            pt_x.append(pin["x"] - dx)
+            pt_y.append(pin["y"] - dy)
         if refdes.startswith("..."):
             refdes = pin.get("name") or refdes.lstrip(".")
         if not refdes:
             continue
+        pair = (net, refdes)
+        if pair in seen_pairs:
+            continue
+        seen_pairs.add(pair)
         kind = "TP" if refdes.startswith("TP") else ("P" if refdes.startswith("P") else refdes[:1])
-        net_to_refs.setdefault(net, {})
-        net_to_refs[net].setdefault(refdes, {"refdes": refdes, "kind": kind, "side": "top"})
-
-    net_to_refs_dict = {n: list(refs.values()) for n, refs in net_to_refs.items()}
+        net_to_refs[net].append({"refdes": refdes, "kind": kind, "side": "top"})
+
+    net_to_refs_dict = dict(net_to_refs)
+    # coordinates stay far below 2**53, so the float sums are exact
+    part_ids = np.asarray(pt_part, dtype=np.intp)
+    pt_count = np.bincount(part_ids, minlength=len(parts)).tolist()
+    pt_sum_x = np.bincount(part_ids, weights=np.asarray(pt_x, dtype=np.float64), minlength=len(parts)).tolist()
+    pt_sum_y = np.bincount(part_ids, weights=np.asarray(pt_y, dtype=np.float64), minlength=len(parts)).tolist()
     components: List[str] = []
-    for p in parts:
-        name = p.get("name") or ""
-        if not name or name == "...":
-            continue
-        if name.startswith("..."):
-            name = name.lstrip(".")
-        if _REFDES_RE.match(name):
-            components.append(name)
     component_details: List[Dict[str, Any]] = []
     for idx, part in enumerate(parts):
         name = part.get("name") or ""
@@ -364,12 +416,13 @@ def parse_xzzpcb(path: str) -> Tuple[set, Dict[str, List[Dict[str, Any]]], Dict[
             continue
         if name.startswith("..."):
             name = name.lstrip(".")
-        if not _REFDES_RE.match(name):
+        if not _fullmatch_refdes(name):
             continue
-        pts = part_points.get(idx, [])
-        if pts:
-            x = sum(p[0] for p in pts) / len(pts)
-            y = sum(p[1] for p in pts) / len(pts)
+        components.append(name)
+        count = pt_count[idx]
+        if count:
+            x = pt_sum_x[idx] / count
+            y = pt_sum_y[idx] / count
         else:
             x, y = 0, 0
         component_details.append(
@@ -387,7 +440,7 @@ def parse_xzzpcb(path: str) -> Tuple[set, Dict[str, List[Dict[str, Any]]], Dict[
         "components_count": len(components),
         "pairs_count": sum(len(v) for v in net_to_refs_dict.values()),
         "outline_segments": [
-            {"x1": a[0], "y1": a[1], "x2": b[0], "y2": b[1]} for a, b in outline_segments
+            {"x1": a[0], "y1": a[1], "x2": b[0], "y2": b[1]} for a, b in _translate_points(outline, dx, dy).tolist()
         ],
         "testpoints": testpads,
         "units": "mil",
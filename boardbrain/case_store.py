@@ -1,11 +1,24 @@
 from __future__ import annotations
+import atexit
+import contextlib
+import datetime
+import functools
 import os
 import shutil
 import json
+import math
 import sqlite3
-from typing import Optional, List, Dict, Any
+import threading
+import urllib.parse
+import uuid
+from typing import Optional, BinaryIO, Iterator, List, Dict, Any, Union
 from .config import SETTINGS
 
+try:
+    import orjson as _orjson
+except Exception:
+    _orjson = None
+
 SCHEMA_SQL = """
 CREATE TABLE IF NOT EXISTS cases (
     case_id TEXT PRIMARY KEY,
@@ -17,6 +30,8 @@ CREATE TABLE IF NOT EXISTS cases (
     created_at TEXT NOT NULL
 );
 
+CREATE INDEX IF NOT EXISTS idx_cases_title ON cases(title);
+
 CREATE TABLE IF NOT EXISTS measurements (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     case_id TEXT NOT NULL,
@@ -121,50 +136,281 @@ CREATE TABLE IF NOT EXISTS expected_ranges (
     note TEXT,
     created_at TEXT NOT NULL
 );
+
+CREATE INDEX IF NOT EXISTS idx_measurements_case ON measurements(case_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_notes_case ON notes(case_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_attachments_case ON attachments(case_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_chat_messages_case ON chat_messages(case_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_plan_versions_case ON plan_versions(case_id, version);
+CREATE INDEX IF NOT EXISTS idx_requested_measurements_case ON requested_measurements(case_id, created_at);
+-- chat paging orders by id; a case_id-only index keeps rowids in order within each case
+CREATE INDEX IF NOT EXISTS idx_chat_messages_case_id ON chat_messages(case_id);
+CREATE INDEX IF NOT EXISTS idx_baseline_measurements_baseline ON baseline_measurements(baseline_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_baseline_attachments_baseline ON baseline_attachments(baseline_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_expected_ranges_board ON expected_ranges(board_id, created_at);
+-- list_cases/list_baselines walk these backwards instead of sorting the table
+CREATE INDEX IF NOT EXISTS idx_cases_created ON cases(created_at);
+CREATE INDEX IF NOT EXISTS idx_baselines_created ON baselines(created_at);
+
+-- Cascade case deletion inside SQLite. A trigger applies to databases created before it existed,
+-- which ON DELETE CASCADE clauses on the child tables would not, and unlike FK actions it does not
+-- fire for the INSERT OR REPLACE in create_case.
+CREATE TRIGGER IF NOT EXISTS cases_delete_cascade AFTER DELETE ON cases
+BEGIN
+    DELETE FROM chat_messages WHERE case_id = OLD.case_id;
+    DELETE FROM plan_versions WHERE case_id = OLD.case_id;
+    DELETE FROM requested_measurements WHERE case_id = OLD.case_id;
+    DELETE FROM attachments WHERE case_id = OLD.case_id;
+    DELETE FROM notes WHERE case_id = OLD.case_id;
+    DELETE FROM measurements WHERE case_id = OLD.case_id;
+END;
 """
 
 
+def _now() -> str:
+    # naive UTC ISO timestamp, the format every stored created_at already uses
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def _loads_json(text: str) -> Any:
+    if _orjson is not None:
+        try:
+            return _orjson.loads(text)
+        except _orjson.JSONDecodeError:
+            # json.dumps may have written NaN/Infinity or integers beyond 64 bits
+            pass
+    return json.loads(text)
+
+
+def _has_non_finite(obj: Any) -> bool:
+    # orjson only serializes exact floats (subclasses raise), so those are the ones to check
+    if type(obj) is float:
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(map(_has_non_finite, obj.values()))
+    if isinstance(obj, (list, tuple)):
+        return any(map(_has_non_finite, obj))
+    return False
+
+
+def _dumps_json(obj: Any) -> str:
+    # orjson would write NaN/Infinity as null; keep json.dumps' NaN/Infinity tokens for those
+    if _orjson is not None and not _has_non_finite(obj):
+        try:
+            return _orjson.dumps(obj).decode()
+        except TypeError:
+            # integers beyond 64 bits, non-str keys
+            pass
+    return json.dumps(obj)
+
+
 def _ensure_column(conn: sqlite3.Connection, table: str, col: str, ddl: str) -> None:
     cols = [r[1] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()]
     if col not in cols:
         conn.execute(ddl)
 
+# One read-write connection per database path, shared by every thread: Streamlit runs each rerun
+# on a new thread, so per-thread connections would pile up. _DB_LOCK serialises its use, and
+# `with _db() as c:` holds it for one transaction without ever closing the connection.
+_DB_LOCK = threading.RLock()
+_CONNS: Dict[str, sqlite3.Connection] = {}
+
+
+# synchronous=NORMAL is durable across application crashes in WAL mode and skips the per-commit fsync.
+_CONN_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-65536;",
+    "PRAGMA mmap_size=268435456;",
+)
+
+
 def _conn() -> sqlite3.Connection:
-    os.makedirs(os.path.dirname(SETTINGS.sqlite_path), exist_ok=True)
-    c = sqlite3.connect(SETTINGS.sqlite_path)
-    c.execute("PRAGMA journal_mode=WAL;")
+    """Return the shared read-write connection; use it only while holding _DB_LOCK."""
+    path = SETTINGS.sqlite_path
+    c = _CONNS.get(path)
+    if c is not None:
+        return c
+    with _DB_LOCK:
+        c = _CONNS.get(path)
+        if c is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            c = sqlite3.connect(path, check_same_thread=False, cached_statements=256)
+            try:
+                for pragma in _CONN_PRAGMAS:
+                    c.execute(pragma)
+                # First connection to this database: set up the schema here, once, so the
+                # accessors below don't have to.
+                _init_schema(c)
+            except BaseException:
+                c.close()
+                raise
+            # published only once the schema is in place
+            _CONNS[path] = c
+    return c
+
+
+@contextlib.contextmanager
+def _db() -> Iterator[sqlite3.Connection]:
+    """Hold the shared connection for one transaction, committing on success."""
+    with _DB_LOCK:
+        c = _conn()
+        with c:
+            yield c
+
+
+# Reads go through one shared read-only connection per database, under its own lock. It never
+# takes the WAL write lock, so SELECTs don't queue behind a writer holding _DB_LOCK.
+_RO_LOCK = threading.RLock()
+_RO_CONNS: Dict[str, sqlite3.Connection] = {}
+_RO_PRAGMAS = (
+    "PRAGMA query_only=1;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-65536;",
+    "PRAGMA mmap_size=268435456;",
+)
+
+
+def _conn_ro() -> sqlite3.Connection:
+    """Return the shared read-only connection; use it only while holding _RO_LOCK."""
+    path = SETTINGS.sqlite_path
+    c = _RO_CONNS.get(path)
+    if c is not None:
+        return c
+    # the read-write connection creates the file and switches it to WAL first; take _DB_LOCK
+    # before _RO_LOCK so the two locks are never acquired in the opposite order
+    with _DB_LOCK:
+        _conn()
+    with _RO_LOCK:
+        c = _RO_CONNS.get(path)
+        if c is None:
+            uri = "file:" + urllib.parse.quote(os.path.abspath(path)) + "?mode=ro"
+            c = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=256)
+            for pragma in _RO_PRAGMAS:
+                c.execute(pragma)
+            _RO_CONNS[path] = c
     return c
 
+
+@contextlib.contextmanager
+def _db_ro() -> Iterator[sqlite3.Connection]:
+    c = _conn_ro()
+    with _RO_LOCK:
+        with c:
+            yield c
+
+
+@contextlib.contextmanager
+def _immediate_txn() -> Iterator[sqlite3.Connection]:
+    """Run the block in one transaction that takes the write lock up front."""
+    with _DB_LOCK:
+        c = _conn()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            yield c
+        except BaseException:
+            c.rollback()
+            raise
+        c.commit()
+
+
+@atexit.register
+def _close_all() -> None:
+    with _RO_LOCK:
+        conns = list(_RO_CONNS.values())
+        _RO_CONNS.clear()
+    with _DB_LOCK:
+        conns += _CONNS.values()
+        _CONNS.clear()
+    for c in conns:
+        try:
+            c.close()
+        except Exception:
+            pass
+
+
+# Stored in PRAGMA user_version once SCHEMA_SQL and the migrations below have run. Bump it
+# whenever either changes so existing databases pick the change up.
+_SCHEMA_VERSION = 1
+
+
+def _init_schema(c: sqlite3.Connection) -> None:
+    with c:
+        if c.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+            c.executescript(SCHEMA_SQL)
+            # Lightweight migrations for older DBs
+            _ensure_column(c, "cases", "board_id", "ALTER TABLE cases ADD COLUMN board_id TEXT")
+            _ensure_column(c, "expected_ranges", "note", "ALTER TABLE expected_ranges ADD COLUMN note TEXT")
+            c.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+
+
 def init_db() -> None:
-    with _conn() as c:
-        c.executescript(SCHEMA_SQL)
-        # Lightweight migrations for older DBs
-        _ensure_column(c, "cases", "board_id", "ALTER TABLE cases ADD COLUMN board_id TEXT")
-        _ensure_column(c, "expected_ranges", "note", "ALTER TABLE expected_ranges ADD COLUMN note TEXT")
+    """Open the shared connection for the configured database, creating the schema if needed."""
+    _conn()
+
+# Read-through cache for the small lookup tables the UI re-reads on every rerun. Each group has a
+# generation counter that writers bump after committing; a cached result is only served while its
+# generation is current. Only writes made through this module are seen, which is all the app does.
+_GEN: Dict[str, int] = {"cases": 0, "baselines": 0, "expected_ranges": 0}
+_READ_CACHE: Dict[str, Dict[tuple, tuple]] = {k: {} for k in _GEN}
+
+
+def _bump(group: str) -> None:
+    _GEN[group] += 1
+    _READ_CACHE[group].clear()
+
+
+def _copy_rows(result: Any) -> Any:
+    # hand out fresh dicts so callers can't mutate the cached rows
+    if result is None:
+        return None
+    if isinstance(result, dict):
+        return dict(result)
+    return [dict(r) for r in result]
+
+
+def _gen_cached(group: str):
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            # keyword calls get their own entry; callers in this repo pass arguments positionally
+            key = (fn.__name__, SETTINGS.sqlite_path, args, tuple(sorted(kwargs.items())) if kwargs else ())
+            gen = _GEN[group]
+            hit = _READ_CACHE[group].get(key)
+            if hit is not None and hit[0] == gen:
+                return _copy_rows(hit[1])
+            result = fn(*args, **kwargs)
+            _READ_CACHE[group][key] = (gen, result)
+            return _copy_rows(result)
+
+        return wrapper
+
+    return deco
+
 
 def get_case_dir(case_id: str) -> str:
     return os.path.join(SETTINGS.data_dir, "cases", case_id)
 
 def create_case(case_id: str, title: str, device_family: str = "MacBook", model: str = "", board_id: str = "", symptom: str = "") -> None:
-    import datetime
-    init_db()
-    with _conn() as c:
+    with _db() as c:
         title = make_unique_case_title(title)
         c.execute(
             "INSERT OR REPLACE INTO cases(case_id,title,device_family,model,board_id,symptom,created_at) VALUES(?,?,?,?,?,?,?)",
-            (case_id, title, device_family, model, board_id, symptom, datetime.datetime.utcnow().isoformat()),
+            (case_id, title, device_family, model, board_id, symptom, _now()),
         )
+    _bump("cases")
     os.makedirs(os.path.join(get_case_dir(case_id), "attachments"), exist_ok=True)
 
+@_gen_cached("cases")
 def list_cases() -> List[Dict[str, Any]]:
-    init_db()
-    with _conn() as c:
+    with _db_ro() as c:
         rows = c.execute("SELECT case_id,title,device_family,model,board_id,symptom,created_at FROM cases ORDER BY created_at DESC").fetchall()
     return [{"case_id": r[0], "title": r[1], "device_family": r[2], "model": r[3], "board_id": r[4], "symptom": r[5], "created_at": r[6]} for r in rows]
 
+@_gen_cached("cases")
 def get_case(case_id: str) -> Optional[Dict[str, Any]]:
-    init_db()
-    with _conn() as c:
+    with _db_ro() as c:
         r = c.execute("SELECT case_id,title,device_family,model,board_id,symptom,created_at FROM cases WHERE case_id=?", (case_id,)).fetchone()
     if not r:
         return None
@@ -172,18 +418,11 @@ def get_case(case_id: str) -> Optional[Dict[str, Any]]:
 
 
 def delete_case(case_id: str) -> bool:
-    init_db()
-    with _conn() as c:
-        exists = c.execute("SELECT 1 FROM cases WHERE case_id=?", (case_id,)).fetchone()
-        if not exists:
+    with _db() as c:
+        # child rows go with it via the cases_delete_cascade trigger
+        if not c.execute("DELETE FROM cases WHERE case_id=?", (case_id,)).rowcount:
             return False
-        c.execute("DELETE FROM chat_messages WHERE case_id=?", (case_id,))
-        c.execute("DELETE FROM plan_versions WHERE case_id=?", (case_id,))
-        c.execute("DELETE FROM requested_measurements WHERE case_id=?", (case_id,))
-        c.execute("DELETE FROM attachments WHERE case_id=?", (case_id,))
-        c.execute("DELETE FROM notes WHERE case_id=?", (case_id,))
-        c.execute("DELETE FROM measurements WHERE case_id=?", (case_id,))
-        c.execute("DELETE FROM cases WHERE case_id=?", (case_id,))
+    _bump("cases")
     case_dir = get_case_dir(case_id)
     if os.path.isdir(case_dir):
         shutil.rmtree(case_dir, ignore_errors=True)
@@ -191,13 +430,18 @@ def delete_case(case_id: str) -> bool:
 
 
 def make_unique_case_title(base_title: str) -> str:
-    init_db()
     base = base_title.strip() or "Untitled"
-    with _conn() as c:
-        rows = c.execute("SELECT title FROM cases").fetchall()
+    # Only the base title and "base (n)" can collide. Fetch them with an exact match plus a
+    # prefix range scan on idx_cases_title; LIKE is case-insensitive and cannot use that index.
+    prefix = base + " ("
+    with _db() as c:
+        if not c.execute("SELECT 1 FROM cases WHERE title=? LIMIT 1", (base,)).fetchone():
+            return base
+        rows = c.execute(
+            "SELECT title FROM cases WHERE title >= ? AND title < ?",
+            (prefix, base + " )"),
+        ).fetchall()
     titles = {r[0] for r in rows}
-    if base not in titles:
-        return base
     n = 2
     while True:
         candidate = f"{base} ({n})"
@@ -206,35 +450,41 @@ def make_unique_case_title(base_title: str) -> str:
         n += 1
 
 
+_CASE_CHILD_TABLES = ("chat_messages", "plan_versions", "requested_measurements", "measurements", "notes", "attachments")
+_SQL_CASE_CHILD_COUNTS = "SELECT " + ", ".join(
+    f"(SELECT COUNT(*) FROM {t} WHERE case_id=?)" for t in _CASE_CHILD_TABLES
+)
+
+
+def _count_files(path: str) -> int:
+    # Same count as summing os.walk's file lists, but using the cached DirEntry type instead of
+    # building per-directory lists.
+    n = 0
+    try:
+        it = os.scandir(path)
+    except OSError:
+        return 0
+    with it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if not is_dir:
+                n += 1
+            elif not entry.is_symlink():
+                n += _count_files(entry.path)
+    return n
+
+
 def get_case_delete_summary(case_id: str) -> Dict[str, Any]:
-    init_db()
-    summary: Dict[str, Any] = {}
-    with _conn() as c:
-        summary["chat_messages"] = c.execute(
-            "SELECT COUNT(*) FROM chat_messages WHERE case_id=?", (case_id,)
-        ).fetchone()[0]
-        summary["plan_versions"] = c.execute(
-            "SELECT COUNT(*) FROM plan_versions WHERE case_id=?", (case_id,)
-        ).fetchone()[0]
-        summary["requested_measurements"] = c.execute(
-            "SELECT COUNT(*) FROM requested_measurements WHERE case_id=?", (case_id,)
-        ).fetchone()[0]
-        summary["measurements"] = c.execute(
-            "SELECT COUNT(*) FROM measurements WHERE case_id=?", (case_id,)
-        ).fetchone()[0]
-        summary["notes"] = c.execute(
-            "SELECT COUNT(*) FROM notes WHERE case_id=?", (case_id,)
-        ).fetchone()[0]
-        summary["attachments"] = c.execute(
-            "SELECT COUNT(*) FROM attachments WHERE case_id=?", (case_id,)
-        ).fetchone()[0]
+    with _db_ro() as c:
+        row = c.execute(_SQL_CASE_CHILD_COUNTS, (case_id,) * len(_CASE_CHILD_TABLES)).fetchone()
+    summary: Dict[str, Any] = dict(zip(_CASE_CHILD_TABLES, row))
     case_dir = get_case_dir(case_id)
-    file_count = 0
-    if os.path.isdir(case_dir):
-        for root, _, files in os.walk(case_dir):
-            file_count += len(files)
-    summary["case_dir_exists"] = os.path.isdir(case_dir)
-    summary["case_dir_files"] = file_count
+    exists = os.path.isdir(case_dir)
+    summary["case_dir_exists"] = exists
+    summary["case_dir_files"] = _count_files(case_dir) if exists else 0
     return summary
 
 
@@ -254,19 +504,18 @@ def create_baseline(
     boot_state: str = "activation/recovery",
     notes: str = "",
 ) -> None:
-    import datetime
-    init_db()
-    with _conn() as c:
+    with _db() as c:
         c.execute(
             "INSERT OR REPLACE INTO baselines(baseline_id,device_family,model,board_id,quality,source,boot_state,notes,created_at) VALUES(?,?,?,?,?,?,?,?,?)",
-            (baseline_id, device_family, model, board_id, quality, source, boot_state, notes, datetime.datetime.utcnow().isoformat()),
+            (baseline_id, device_family, model, board_id, quality, source, boot_state, notes, _now()),
         )
+    _bump("baselines")
     os.makedirs(os.path.join(get_baseline_dir(baseline_id), "attachments"), exist_ok=True)
 
 
+@_gen_cached("baselines")
 def list_baselines() -> List[Dict[str, Any]]:
-    init_db()
-    with _conn() as c:
+    with _db_ro() as c:
         rows = c.execute(
             "SELECT baseline_id,device_family,model,board_id,quality,source,boot_state,notes,created_at FROM baselines ORDER BY created_at DESC"
         ).fetchall()
@@ -286,9 +535,9 @@ def list_baselines() -> List[Dict[str, Any]]:
     ]
 
 
+@_gen_cached("baselines")
 def get_baseline(baseline_id: str) -> Optional[Dict[str, Any]]:
-    init_db()
-    with _conn() as c:
+    with _db_ro() as c:
         r = c.execute(
             "SELECT baseline_id,device_family,model,board_id,quality,source,boot_state,notes,created_at FROM baselines WHERE baseline_id=?",
             (baseline_id,),
@@ -309,18 +558,23 @@ def get_baseline(baseline_id: str) -> Optional[Dict[str, Any]]:
 
 
 def add_baseline_measurement(baseline_id: str, name: str, value: str, unit: str = "", note: str = "") -> None:
-    import datetime
-    init_db()
-    with _conn() as c:
-        c.execute(
+    add_baseline_measurements(baseline_id, [{"name": name, "value": value, "unit": unit, "note": note}])
+
+
+def add_baseline_measurements(baseline_id: str, items: List[Dict[str, Any]]) -> None:
+    now = _now()
+    rows = [(baseline_id, it["name"], it["value"], it.get("unit", ""), it.get("note", ""), now) for it in items]
+    if not rows:
+        return
+    with _db() as c:
+        c.executemany(
             "INSERT INTO baseline_measurements(baseline_id,name,value,unit,note,created_at) VALUES(?,?,?,?,?,?)",
-            (baseline_id, name, value, unit, note, datetime.datetime.utcnow().isoformat()),
+            rows,
         )
 
 
 def list_baseline_measurements(baseline_id: str) -> List[Dict[str, Any]]:
-    init_db()
-    with _conn() as c:
+    with _db_ro() as c:
         rows = c.execute(
             "SELECT name,value,unit,note,created_at FROM baseline_measurements WHERE baseline_id=? ORDER BY created_at ASC",
             (baseline_id,),
@@ -328,26 +582,57 @@ def list_baseline_measurements(baseline_id: str) -> List[Dict[str, Any]]:
     return [{"name": r[0], "value": r[1], "unit": r[2], "note": r[3], "created_at": r[4]} for r in rows]
 
 
-def save_baseline_attachment(baseline_id: str, filename: str, content: bytes, a_type: str) -> str:
-    import datetime
-    init_db()
+def _write_attachment_temp(abs_path: str, content: Union[bytes, BinaryIO]) -> str:
+    """Write and sync content to a temp file beside abs_path and return its path."""
+    directory, name = os.path.split(abs_path)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "xb") as f:
+            # file-like uploads are streamed in 1 MiB chunks instead of being materialized as bytes first
+            if isinstance(content, (bytes, bytearray, memoryview)):
+                f.write(content)
+            else:
+                shutil.copyfileobj(content, f, 1 << 20)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+
+def _store_attachment(abs_path: str, content: Union[bytes, BinaryIO], insert_sql: str, params: tuple) -> None:
+    # The slow write and fsync happen before the write lock is taken; the transaction only
+    # inserts the row and renames the synced file into place. On failure only the temp file
+    # goes, so an existing file of the same name (and the rows pointing at it) is left alone.
+    tmp_path = _write_attachment_temp(abs_path, content)
+    try:
+        with _immediate_txn() as c:
+            c.execute(insert_sql, params)
+            os.replace(tmp_path, abs_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def save_baseline_attachment(baseline_id: str, filename: str, content: Union[bytes, BinaryIO], a_type: str) -> str:
     safe_name = filename.replace("/", "_")
     rel_path = os.path.join("baselines", baseline_id, "attachments", safe_name)
     abs_path = os.path.join(SETTINGS.data_dir, rel_path)
-    os.makedirs(os.path.dirname(abs_path), exist_ok=True)
-    with open(abs_path, "wb") as f:
-        f.write(content)
-    with _conn() as c:
-        c.execute(
-            "INSERT INTO baseline_attachments(baseline_id,filename,rel_path,type,created_at) VALUES(?,?,?,?,?)",
-            (baseline_id, safe_name, rel_path, a_type, datetime.datetime.utcnow().isoformat()),
-        )
+    _store_attachment(
+        abs_path,
+        content,
+        "INSERT INTO baseline_attachments(baseline_id,filename,rel_path,type,created_at) VALUES(?,?,?,?,?)",
+        (baseline_id, safe_name, rel_path, a_type, _now()),
+    )
     return abs_path
 
 
 def list_baseline_attachments(baseline_id: str) -> List[Dict[str, Any]]:
-    init_db()
-    with _conn() as c:
+    with _db_ro() as c:
         rows = c.execute(
             "SELECT filename,rel_path,type,created_at FROM baseline_attachments WHERE baseline_id=? ORDER BY created_at ASC",
             (baseline_id,),
@@ -355,105 +640,119 @@ def list_baseline_attachments(baseline_id: str) -> List[Dict[str, Any]]:
     return [{"filename": r[0], "rel_path": r[1], "type": r[2], "created_at": r[3]} for r in rows]
 
 def add_measurement(case_id: str, name: str, value: str, unit: str = "", note: str = "") -> None:
-    import datetime
-    init_db()
-    with _conn() as c:
-        c.execute(
+    add_measurements(case_id, [{"name": name, "value": value, "unit": unit, "note": note}])
+
+def add_measurements(case_id: str, items: List[Dict[str, Any]]) -> None:
+    """Insert several measurements in one transaction; items carry name, value and optional unit/note."""
+    now = _now()
+    rows = [(case_id, it["name"], it["value"], it.get("unit", ""), it.get("note", ""), now) for it in items]
+    if not rows:
+        return
+    with _db() as c:
+        c.executemany(
             "INSERT INTO measurements(case_id,name,value,unit,note,created_at) VALUES(?,?,?,?,?,?)",
-            (case_id, name, value, unit, note, datetime.datetime.utcnow().isoformat()),
+            rows,
         )
 
 def list_measurements(case_id: str) -> List[Dict[str, Any]]:
-    init_db()
-    with _conn() as c:
+    with _db_ro() as c:
         rows = c.execute("SELECT name,value,unit,note,created_at FROM measurements WHERE case_id=? ORDER BY created_at ASC", (case_id,)).fetchall()
     return [{"name": r[0], "value": r[1], "unit": r[2], "note": r[3], "created_at": r[4]} for r in rows]
 
 def add_note(case_id: str, note: str) -> None:
-    import datetime
-    init_db()
-    with _conn() as c:
-        c.execute("INSERT INTO notes(case_id,note,created_at) VALUES(?,?,?)", (case_id, note, datetime.datetime.utcnow().isoformat()))
+    add_notes(case_id, [note])
+
+def add_notes(case_id: str, notes: List[str]) -> None:
+    now = _now()
+    rows = [(case_id, note, now) for note in notes]
+    if not rows:
+        return
+    with _db() as c:
+        c.executemany("INSERT INTO notes(case_id,note,created_at) VALUES(?,?,?)", rows)
 
 def list_notes(case_id: str) -> List[Dict[str, Any]]:
-    init_db()
-    with _conn() as c:
+    with _db_ro() as c:
         rows = c.execute("SELECT note,created_at FROM notes WHERE case_id=? ORDER BY created_at ASC", (case_id,)).fetchall()
     return [{"note": r[0], "created_at": r[1]} for r in rows]
 
-def save_attachment(case_id: str, filename: str, content: bytes, a_type: str) -> str:
-    import datetime
-    init_db()
+def save_attachment(case_id: str, filename: str, content: Union[bytes, BinaryIO], a_type: str) -> str:
     safe_name = filename.replace("/", "_")
     rel_path = os.path.join("cases", case_id, "attachments", safe_name)
     abs_path = os.path.join(SETTINGS.data_dir, rel_path)
-    os.makedirs(os.path.dirname(abs_path), exist_ok=True)
-    with open(abs_path, "wb") as f:
-        f.write(content)
-    with _conn() as c:
-        c.execute(
-            "INSERT INTO attachments(case_id,filename,rel_path,type,created_at) VALUES(?,?,?,?,?)",
-            (case_id, safe_name, rel_path, a_type, datetime.datetime.utcnow().isoformat()),
-        )
+    _store_attachment(
+        abs_path,
+        content,
+        "INSERT INTO attachments(case_id,filename,rel_path,type,created_at) VALUES(?,?,?,?,?)",
+        (case_id, safe_name, rel_path, a_type, _now()),
+    )
     return abs_path
 
 def list_attachments(case_id: str) -> List[Dict[str, Any]]:
-    init_db()
-    with _conn() as c:
+    with _db_ro() as c:
         rows = c.execute("SELECT filename,rel_path,type,created_at FROM attachments WHERE case_id=? ORDER BY created_at ASC", (case_id,)).fetchall()
     return [{"filename": r[0], "rel_path": r[1], "type": r[2], "created_at": r[3]} for r in rows]
 
 
 def add_chat_message(case_id: str, role: str, content: str, meta: Optional[Dict[str, Any]] = None) -> int:
-    import datetime
-    init_db()
-    meta_json = json.dumps(meta) if meta is not None else None
-    with _conn() as c:
+    meta_json = _dumps_json(meta) if meta is not None else None
+    with _db() as c:
         cur = c.execute(
             "INSERT INTO chat_messages(case_id,role,content,created_at,meta_json) VALUES(?,?,?,?,?)",
-            (case_id, role, content, datetime.datetime.utcnow().isoformat(), meta_json),
+            (case_id, role, content, _now(), meta_json),
         )
         return int(cur.lastrowid)
 
 
 def list_chat_messages(case_id: str) -> List[Dict[str, Any]]:
-    init_db()
-    with _conn() as c:
+    with _db_ro() as c:
         rows = c.execute(
             "SELECT id,role,content,created_at,meta_json FROM chat_messages WHERE case_id=? ORDER BY created_at ASC",
             (case_id,),
         ).fetchall()
     out = []
     for r in rows:
-        meta = json.loads(r[4]) if r[4] else None
+        meta = _loads_json(r[4]) if r[4] else None
         out.append({"id": r[0], "role": r[1], "content": r[2], "created_at": r[3], "meta": meta})
     return out
 
 
+def list_chat_messages_desc(case_id: str, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+    with _db_ro() as c:
+        rows = c.execute(
+            "SELECT id,role,content,created_at,meta_json FROM chat_messages WHERE case_id=? ORDER BY id DESC LIMIT ? OFFSET ?",
+            (case_id, limit, offset),
+        ).fetchall()
+    out = []
+    for r in rows:
+        meta = _loads_json(r[4]) if r[4] else None
+        out.append({"id": r[0], "role": r[1], "content": r[2], "created_at": r[3], "meta": meta})
+    return out
+
+
+def count_chat_messages(case_id: str) -> int:
+    with _db_ro() as c:
+        return c.execute("SELECT COUNT(*) FROM chat_messages WHERE case_id=?", (case_id,)).fetchone()[0]
+
+
 def add_plan_version(
     case_id: str,
     plan_markdown: str,
     citations: Optional[Dict[str, Any]] = None,
     derived_from_message_id: Optional[int] = None,
 ) -> int:
-    import datetime
-    init_db()
-    citations_json = json.dumps(citations) if citations is not None else None
-    with _conn() as c:
-        v = c.execute(
-            "SELECT COALESCE(MAX(version), 0) + 1 FROM plan_versions WHERE case_id=?",
-            (case_id,),
-        ).fetchone()[0]
+    citations_json = _dumps_json(citations) if citations is not None else None
+    with _db() as c:
+        # the next version number is computed inside the INSERT, so concurrent writers cannot reuse it
         cur = c.execute(
-            "INSERT INTO plan_versions(case_id,version,plan_markdown,created_at,derived_from_message_id,citations_json) VALUES(?,?,?,?,?,?)",
-            (case_id, v, plan_markdown, datetime.datetime.utcnow().isoformat(), derived_from_message_id, citations_json),
+            "INSERT INTO plan_versions(case_id,version,plan_markdown,created_at,derived_from_message_id,citations_json) "
+            "SELECT ?, COALESCE(MAX(version), 0) + 1, ?, ?, ?, ? FROM plan_versions WHERE case_id=?",
+            (case_id, plan_markdown, _now(), derived_from_message_id, citations_json, case_id),
         )
         return int(cur.lastrowid)
 
 
 def get_latest_plan(case_id: str) -> Optional[str]:
-    init_db()
-    with _conn() as c:
+    with _db_ro() as c:
         r = c.execute(
             "SELECT plan_markdown FROM plan_versions WHERE case_id=? ORDER BY version DESC LIMIT 1",
             (case_id,),
@@ -462,15 +761,14 @@ def get_latest_plan(case_id: str) -> Optional[str]:
 
 
 def list_plan_versions(case_id: str) -> List[Dict[str, Any]]:
-    init_db()
-    with _conn() as c:
+    with _db_ro() as c:
         rows = c.execute(
             "SELECT id,version,plan_markdown,created_at,derived_from_message_id,citations_json FROM plan_versions WHERE case_id=? ORDER BY version DESC",
             (case_id,),
         ).fetchall()
     out = []
     for r in rows:
-        citations = json.loads(r[5]) if r[5] else None
+        citations = _loads_json(r[5]) if r[5] else None
         out.append(
             {
                 "id": r[0],
@@ -485,14 +783,12 @@ def list_plan_versions(case_id: str) -> List[Dict[str, Any]]:
 
 
 def set_requested_measurements(case_id: str, items: List[Dict[str, Any]]) -> None:
-    import datetime
-    init_db()
-    now = datetime.datetime.utcnow().isoformat()
+    now = _now()
     rows = []
     for it in items:
-        meta_json = json.dumps(it.get("meta")) if it.get("meta") is not None else None
+        meta_json = _dumps_json(it.get("meta")) if it.get("meta") is not None else None
         rows.append((case_id, it["key"], it["prompt"], "pending", now, None, meta_json))
-    with _conn() as c:
+    with _immediate_txn() as c:
         c.execute("DELETE FROM requested_measurements WHERE case_id=?", (case_id,))
         if rows:
             c.executemany(
@@ -502,25 +798,22 @@ def set_requested_measurements(case_id: str, items: List[Dict[str, Any]]) -> Non
 
 
 def mark_requested_measurement_done(case_id: str, key: str) -> None:
-    import datetime
-    init_db()
-    with _conn() as c:
+    with _db() as c:
         c.execute(
             "UPDATE requested_measurements SET status=?, resolved_at=? WHERE case_id=? AND key=?",
-            ("done", datetime.datetime.utcnow().isoformat(), case_id, key),
+            ("done", _now(), case_id, key),
         )
 
 
 def list_requested_measurements(case_id: str) -> List[Dict[str, Any]]:
-    init_db()
-    with _conn() as c:
+    with _db_ro() as c:
         rows = c.execute(
             "SELECT id,key,prompt,status,created_at,resolved_at,meta_json FROM requested_measurements WHERE case_id=? ORDER BY created_at ASC",
             (case_id,),
         ).fetchall()
     out = []
     for r in rows:
-        meta = json.loads(r[6]) if r[6] else None
+        meta = _loads_json(r[6]) if r[6] else None
         out.append(
             {
                 "id": r[0],
@@ -545,29 +838,52 @@ def add_expected_range(
     source: str,
     note: str = "",
 ) -> None:
-    import datetime
-    init_db()
-    with _conn() as c:
-        c.execute(
+    add_expected_ranges(
+        board_id,
+        [
+            {
+                "net": net,
+                "measurement_type": measurement_type,
+                "expected_min": expected_min,
+                "expected_max": expected_max,
+                "unit": unit,
+                "source": source,
+                "note": note,
+            }
+        ],
+    )
+
+
+def add_expected_ranges(board_id: str, items: List[Dict[str, Any]]) -> None:
+    now = _now()
+    rows = [
+        (
+            board_id,
+            it["net"],
+            it["measurement_type"],
+            it["expected_min"],
+            it["expected_max"],
+            it["unit"],
+            it["source"],
+            it.get("note", ""),
+            now,
+        )
+        for it in items
+    ]
+    if not rows:
+        return
+    with _db() as c:
+        c.executemany(
             "INSERT INTO expected_ranges(board_id,net,measurement_type,expected_min,expected_max,unit,source,note,created_at) "
             "VALUES(?,?,?,?,?,?,?,?,?)",
-            (
-                board_id,
-                net,
-                measurement_type,
-                expected_min,
-                expected_max,
-                unit,
-                source,
-                note,
-                datetime.datetime.utcnow().isoformat(),
-            ),
+            rows,
         )
+    _bump("expected_ranges")
 
 
+@_gen_cached("expected_ranges")
 def list_expected_ranges(board_id: str) -> List[Dict[str, Any]]:
-    init_db()
-    with _conn() as c:
+    with _db_ro() as c:
         rows = c.execute(
             "SELECT id,net,measurement_type,expected_min,expected_max,unit,source,note,created_at "
             "FROM expected_ranges WHERE board_id=? ORDER BY created_at DESC",
@@ -599,15 +915,15 @@ def update_expected_range(
     source: str,
     note: str = "",
 ) -> None:
-    init_db()
-    with _conn() as c:
+    with _db() as c:
         c.execute(
             "UPDATE expected_ranges SET net=?,measurement_type=?,expected_min=?,expected_max=?,unit=?,source=?,note=? WHERE id=?",
             (net, measurement_type, expected_min, expected_max, unit, source, note, range_id),
         )
+    _bump("expected_ranges")
 
 
 def delete_expected_range(range_id: int) -> None:
-    init_db()
-    with _conn() as c:
+    with _db() as c:
         c.execute("DELETE FROM expected_ranges WHERE id=?", (range_id,))
+    _bump("expected_ranges")
@@ -182,21 +182,7 @@ def get_measurement_points(
     return get_measure_points(board_id, net, case=case, k=k)
 
 
-def measurement_points_for_net(
-    board_id: str,
-    net: str,
-    case: Optional[Dict[str, Any]] = None,
-    k: int = 6,
-    known_components: Optional[set] = None,
-) -> List[str]:
-    nets, _ = load_netlist(board_id=board_id, case=case)
-    canon = canonicalize_net_name(net)
-    if not canon or canon not in nets:
-        return []
-    if known_components is None:
-        known_components, _ = load_component_index(board_id=board_id, case=case)
-    net_refs, _ = load_net_refs(board_id=board_id, case=case)
-    items = net_refs.get(canon, []) or []
+def _rank_measurement_points(items: List[Any], known_components: set, k: int) -> List[str]:
     refs: List[str] = []
     for item in items:
         if isinstance(item, dict):
@@ -225,6 +211,47 @@ def measurement_points_for_net(
     return ranked[:k]
 
 
+def measurement_points_for_net(
+    board_id: str,
+    net: str,
+    case: Optional[Dict[str, Any]] = None,
+    k: int = 6,
+    known_components: Optional[set] = None,
+) -> List[str]:
+    nets, _ = load_netlist(board_id=board_id, case=case)
+    canon = canonicalize_net_name(net)
+    if not canon or canon not in nets:
+        return []
+    if known_components is None:
+        known_components, _ = load_component_index(board_id=board_id, case=case)
+    net_refs, _ = load_net_refs(board_id=board_id, case=case)
+    return _rank_measurement_points(net_refs.get(canon, []) or [], known_components, k)
+
+
+def measurement_points_for_nets(
+    board_id: str,
+    nets: List[str],
+    case: Optional[Dict[str, Any]] = None,
+    k: int = 6,
+    known_components: Optional[set] = None,
+) -> Dict[str, List[str]]:
+    """Bulk variant of measurement_points_for_net; loads each index once."""
+    known_nets, _ = load_netlist(board_id=board_id, case=case)
+    if known_components is None:
+        known_components, _ = load_component_index(board_id=board_id, case=case)
+    net_refs, _ = load_net_refs(board_id=board_id, case=case)
+    out: Dict[str, List[str]] = {}
+    for net in nets:
+        if net in out:
+            continue
+        canon = canonicalize_net_name(net)
+        if not canon or canon not in known_nets:
+            out[net] = []
+            continue
+        out[net] = _rank_measurement_points(net_refs.get(canon, []) or [], known_components, k)
+    return out
+
+
 def get_measurement_points_from_cache(
     net: str,
     net_to_refdes: Dict[str, List[Any]],
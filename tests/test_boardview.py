@@ -0,0 +1,106 @@
+import os
+import struct
+from pathlib import Path
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pytest
+
+import boardbrain.boardview as boardview
+from boardbrain.boardview import detect_boardview_format, parse_boardview, parse_bvraw_format_3_text
+
+
+@pytest.fixture(autouse=True)
+def _isolated_parse_cache(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(boardview, "SETTINGS", SimpleNamespace(data_dir=str(tmp_path / "data")))
+    boardview._PARSE_CACHE.clear()
+
+
+def _make_generic_boardview(path: Path, n_nets: int = 24, n_comps: int = 30, n_pins: int = 80) -> None:
+    nets = [f"PP{i}V_NET_{i}" for i in range(n_nets)]
+    comps = [f"C{100 + i}" for i in range(n_comps)]
+    buf = bytearray(b"BVR2" + b"\xff" * 60)
+    net_offsets = []
+    for n in nets:
+        net_offsets.append(len(buf))
+        buf += n.encode("ascii") + b"\x00"
+    comp_offsets = []
+    for c in comps:
+        comp_offsets.append(len(buf))
+        buf += c.encode("ascii") + b"\x00"
+    while len(buf) % 4:
+        buf += b"\xff"
+    buf += b"\xff" * 8
+    for off in net_offsets:
+        buf += struct.pack("<I", off)
+    buf += b"\xff" * 8
+    for off in comp_offsets:
+        buf += struct.pack("<I", off)
+    buf += b"\xff" * 8
+    for i in range(n_pins):
+        buf += struct.pack("<II", i % n_comps, (i * 7) % n_nets)
+    buf += b"\xff" * (len(buf) // 2)
+    path.write_bytes(bytes(buf))
+
+
+def test_parse_boardview_generic_pin_table(tmp_path: Path):
+    path = tmp_path / "board.bvr"
+    _make_generic_boardview(path)
+    nets, net_to_refs, meta = parse_boardview(str(path))
+    assert len(nets) == 24
+    assert meta["components_count"] == 30
+    assert meta["pin_records"] == 80
+    assert meta["pin_table_layout"] == "comp_net:8"
+    refs = {r["refdes"] for r in net_to_refs["PP0V_NET_0"]}
+    assert "C100" in refs
+
+
+def test_parse_boardview_memoized(tmp_path: Path, monkeypatch):
+    path = tmp_path / "board.bvr"
+    _make_generic_boardview(path)
+    first = parse_boardview(str(path))
+    assert parse_boardview(str(path)) is first
+
+    boardview._PARSE_CACHE.clear()
+
+    def _fail(_path):
+        raise AssertionError("expected the on-disk parse cache to be used")
+
+    monkeypatch.setattr(boardview, "_parse_boardview_file", _fail)
+    second = parse_boardview(str(path))
+    assert second is not first
+    assert second == first
+
+
+def test_bvraw3_text_and_detection():
+    text = "BVRAW_FORMAT_3\nPART_NAME U1\nPIN_NET PPBUS_AON\nPIN_NET GND\nPART_END\nPART_NAME TP7\nPIN_NET PPBUS_AON\nPART_END\n"
+    assert detect_boardview_format("x.bvr", text.encode("ascii")) == "BVRAW_FORMAT_3"
+    nets, net_to_refs, meta = parse_bvraw_format_3_text(text)
+    assert "PPBUS_AON" in nets
+    assert {r["refdes"] for r in net_to_refs["PPBUS_AON"]} == {"U1", "TP7"}
+    assert net_to_refs["PPBUS_AON"][1]["kind"] == "TP"
+    assert meta["components"] == ["TP7", "U1"]
+
+
+def test_parse_boardview_empty_file(tmp_path: Path):
+    path = tmp_path / "empty.bvr"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError, match="unsupported_boardview_format"):
+        parse_boardview(str(path))
+
+
+def test_parse_cache_ignores_other_versions(tmp_path: Path, monkeypatch):
+    path = tmp_path / "board.bvr"
+    _make_generic_boardview(path)
+    first = parse_boardview(str(path))
+    cache_dir = Path(boardview._parse_cache_path(str(path))).parent
+    assert [p.name for p in cache_dir.iterdir() if p.name.endswith(".tmp")] == []
+
+    boardview._PARSE_CACHE.clear()
+    monkeypatch.setattr(boardview, "_PARSE_CACHE_VERSION", boardview._PARSE_CACHE_VERSION + 1)
+    calls = []
+    real = boardview._parse_boardview_file
+    monkeypatch.setattr(boardview, "_parse_boardview_file", lambda p: calls.append(p) or real(p))
+    assert parse_boardview(str(path)) == first
+    assert calls == [str(path)]
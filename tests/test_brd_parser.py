@@ -1,7 +1,10 @@
 import os
+from pathlib import Path
+
 import pytest
 
-from boardbrain.boardview.brd_parser import parse_brd
+from boardbrain.boardview import detect_boardview_format
+from boardbrain.boardview.brd_parser import BRD_SIGNATURE, _decode_brd, parse_brd
 
 
 def test_brd_parser_sample():
@@ -13,3 +16,34 @@ def test_brd_parser_sample():
     assert len(nets) > 0
     assert meta.get("components_count", 0) > 0
     assert meta.get("pairs_count", 0) > 0
+
+
+def _scramble_brd(text: bytes) -> bytes:
+    table = bytes(
+        b if b in (0x00, 0x0A, 0x0D) else (((~b & 0xFF) >> 2) | ((~b & 0xFF) << 6)) & 0xFF for b in range(256)
+    )
+    return BRD_SIGNATURE + text.translate(table)[4:]
+
+
+def test_parse_brd_scrambled(tmp_path: Path):
+    text = (
+        b"\x00\x00\x00\x00\n"
+        b"var_data:\n2 2 3 1\n"
+        b"Format:\n0 0\n100 50\n"
+        b"Parts:\nU1 5 2\nTP7 10 3\n"
+        b"Pins:\n10 10 1 1 PPBUS_AON\n20 10 2 1 GND\n30 30 3 2 PPBUS_AON\n"
+        b"Nails:\n3 30 30 1 PPBUS_AON\n"
+    )
+    data = _scramble_brd(text)
+    decoded, scrambled = _decode_brd(data)
+    assert scrambled
+    assert decoded[4:] == text[4:]
+
+    path = tmp_path / "board.brd"
+    path.write_bytes(data)
+    assert detect_boardview_format(str(path), data) == "BRD"
+    nets, net_to_refs, meta = parse_brd(str(path))
+    assert {"PPBUS_AON", "GND"} <= nets
+    assert [r["refdes"] for r in net_to_refs["PPBUS_AON"]] == ["U1", "TP7"]
+    assert meta["components"] == ["U1", "TP7"]
+    assert meta["bounds"] == {"min_x": 0, "min_y": 0, "max_x": 100, "max_y": 50}
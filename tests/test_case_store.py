@@ -0,0 +1,261 @@
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pytest
+
+import boardbrain.case_store as case_store
+
+
+@pytest.fixture(autouse=True)
+def _isolated_store(tmp_path: Path, monkeypatch):
+    data_dir = tmp_path / "data"
+    monkeypatch.setattr(
+        case_store,
+        "SETTINGS",
+        SimpleNamespace(data_dir=str(data_dir), sqlite_path=str(data_dir / "boardbrain.sqlite3")),
+    )
+    yield
+    case_store._close_all()
+
+
+def test_case_roundtrip_reuses_connection():
+    case_store.create_case("C1", "Board", model="A2338", board_id="820-02020")
+    case_store.create_case("C2", "Board")
+    assert case_store._conn() is case_store._conn()
+
+    cases = {c["case_id"]: c for c in case_store.list_cases()}
+    assert cases["C1"]["board_id"] == "820-02020"
+    assert cases["C2"]["title"] == "Board (2)"
+    assert case_store.get_case("C1")["model"] == "A2338"
+    assert case_store.get_case("missing") is None
+
+
+def test_delete_case_removes_children():
+    case_store.create_case("C1", "Board")
+    case_store.add_measurement("C1", "PPBUS_AON", "12.5", "V")
+    case_store.add_note("C1", "no power")
+    case_store.add_chat_message("C1", "user", "hello", meta={"k": 1})
+    case_store.add_plan_version("C1", "plan v1")
+    case_store.save_attachment("C1", "a/b.png", b"png", "image")
+
+    summary = case_store.get_case_delete_summary("C1")
+    assert summary["measurements"] == 1
+    assert summary["notes"] == 1
+    assert summary["chat_messages"] == 1
+    assert summary["plan_versions"] == 1
+    assert summary["attachments"] == 1
+    assert summary["case_dir_files"] == 1
+
+    assert case_store.delete_case("C1")
+    assert not case_store.delete_case("C1")
+    assert case_store.list_measurements("C1") == []
+    assert case_store.list_chat_messages("C1") == []
+    assert case_store.list_plan_versions("C1") == []
+    assert case_store.list_notes("C1") == []
+    assert case_store.get_case_delete_summary("C1")["case_dir_exists"] is False
+
+
+def test_plan_versions_increment():
+    case_store.create_case("C1", "Board")
+    case_store.add_plan_version("C1", "plan v1")
+    case_store.add_plan_version("C1", "plan v2", citations={"src": ["x"]})
+    versions = case_store.list_plan_versions("C1")
+    assert [v["version"] for v in versions] == [2, 1]
+    assert versions[0]["citations"] == {"src": ["x"]}
+    assert case_store.get_latest_plan("C1") == "plan v2"
+
+
+def test_init_db_runs_schema_once(monkeypatch):
+    case_store.init_db()
+    calls = []
+    monkeypatch.setattr(case_store, "_ensure_column", lambda *a: calls.append(a))
+    case_store.init_db()
+    case_store.list_cases()
+    assert calls == []
+
+
+def test_recreate_case_keeps_children():
+    case_store.create_case("C1", "Board")
+    case_store.add_note("C1", "keep me")
+    case_store.create_case("C1", "Board renamed")
+    assert [n["note"] for n in case_store.list_notes("C1")] == ["keep me"]
+
+
+def test_set_requested_measurements_replaces_batch():
+    case_store.create_case("C1", "Board")
+    case_store.set_requested_measurements("C1", [{"key": "a", "prompt": "A?"}, {"key": "b", "prompt": "B?", "meta": {"n": 1}}])
+    case_store.set_requested_measurements("C1", [{"key": "c", "prompt": "C?"}])
+    items = case_store.list_requested_measurements("C1")
+    assert [(i["key"], i["status"]) for i in items] == [("c", "pending")]
+    assert not case_store._conn().in_transaction
+
+
+def test_make_unique_case_title_skips_taken_suffixes():
+    for i, title in enumerate(["Board", "Board (2)", "Board (3)", "board (4)", "Board (10)", "Board x"]):
+        case_store.create_case(f"C{i}", title)
+    assert case_store.make_unique_case_title("Board") == "Board (4)"
+    assert case_store.make_unique_case_title("Other") == "Other"
+
+
+def test_chat_meta_roundtrip_non_strict_json():
+    case_store.create_case("C1", "Board")
+    case_store.add_chat_message("C1", "assistant", "hi", meta={"v": float("nan"), "big": 2**70})
+    case_store.add_chat_message("C1", "user", "plain")
+    first, second = case_store.list_chat_messages("C1")
+    assert first["meta"]["big"] == 2**70 and first["meta"]["v"] != first["meta"]["v"]
+    assert second["meta"] is None
+
+
+def test_save_attachment_streams_file_objects():
+    import io
+
+    case_store.create_case("C1", "Board")
+    path = case_store.save_attachment("C1", "scope.bin", io.BytesIO(b"\x00\x01" * 1000), "scope")
+    assert Path(path).read_bytes() == b"\x00\x01" * 1000
+    assert [a["filename"] for a in case_store.list_attachments("C1")] == ["scope.bin"]
+
+
+def test_save_attachment_failure_leaves_no_file(monkeypatch):
+    case_store.create_case("C1", "Board")
+
+    class _Broken:
+        def read(self, n=-1):
+            raise OSError("upload interrupted")
+
+    with pytest.raises(OSError):
+        case_store.save_attachment("C1", "x.png", _Broken(), "image")
+    assert case_store.list_attachments("C1") == []
+    assert not (Path(case_store.get_case_dir("C1")) / "attachments" / "x.png").exists()
+
+
+def test_bulk_measurements_and_notes():
+    case_store.create_case("C1", "Board")
+    case_store.add_measurements("C1", [{"name": "PPBUS_AON", "value": "12.5", "unit": "V"}, {"name": "PP3V3", "value": "0"}])
+    case_store.add_measurements("C1", [])
+    case_store.add_notes("C1", ["a", "b"])
+    meas = {m["name"]: m for m in case_store.list_measurements("C1")}
+    assert meas["PPBUS_AON"]["unit"] == "V"
+    assert meas["PP3V3"]["value"] == "0"
+    assert sorted(n["note"] for n in case_store.list_notes("C1")) == ["a", "b"]
+
+
+def test_lookup_cache_invalidated_by_writers():
+    case_store.create_case("C1", "Board")
+    first = case_store.get_case("C1")
+    first["title"] = "mutated"
+    assert case_store.get_case("C1")["title"] == "Board"
+    assert len(case_store.list_cases()) == 1
+    case_store.create_case("C2", "Other")
+    assert len(case_store.list_cases()) == 2
+    case_store.delete_case("C1")
+    assert case_store.get_case("C1") is None
+
+    case_store.add_expected_range("B1", "PPBUS_AON", "voltage", "12", "13", "V", "manual")
+    (rng,) = case_store.list_expected_ranges("B1")
+    case_store.update_expected_range(rng["id"], "PPBUS_AON", "voltage", "12", "12.6", "V", "manual")
+    assert case_store.list_expected_ranges("B1")[0]["expected_max"] == "12.6"
+    case_store.delete_expected_range(rng["id"])
+    assert case_store.list_expected_ranges("B1") == []
+
+
+def test_reads_use_read_only_connection():
+    import sqlite3
+
+    case_store.create_case("C1", "Board")
+    case_store.add_note("C1", "n1")
+    assert [n["note"] for n in case_store.list_notes("C1")] == ["n1"]
+    case_store.add_note("C1", "n2")
+    assert len(case_store.list_notes("C1")) == 2
+    ro = case_store._conn_ro()
+    assert ro is not case_store._conn()
+    with pytest.raises(sqlite3.OperationalError):
+        ro.execute("DELETE FROM notes")
+
+
+def test_init_db_skips_schema_for_current_db(monkeypatch):
+    case_store.create_case("C1", "Board")
+    assert case_store._conn().execute("PRAGMA user_version").fetchone()[0] == case_store._SCHEMA_VERSION
+    case_store._close_all()
+    monkeypatch.setattr(case_store, "SCHEMA_SQL", "not valid sql")
+    case_store.init_db()
+    assert case_store.get_case("C1")["title"] == "Board"
+
+
+def test_init_db_migrates_legacy_db():
+    import sqlite3
+
+    os.makedirs(case_store.SETTINGS.data_dir)
+    legacy = sqlite3.connect(case_store.SETTINGS.sqlite_path)
+    legacy.execute(
+        "CREATE TABLE cases (case_id TEXT PRIMARY KEY, title TEXT NOT NULL, device_family TEXT NOT NULL, "
+        "model TEXT, symptom TEXT, created_at TEXT NOT NULL)"
+    )
+    legacy.execute("INSERT INTO cases VALUES('C1','Old','MacBook','','','2024-01-01T00:00:00')")
+    legacy.commit()
+    legacy.close()
+    assert case_store.get_case("C1")["board_id"] is None
+    case_store.add_expected_range("B1", "PPBUS_AON", "voltage", "12", "13", "V", "manual", note="n")
+    assert case_store.list_expected_ranges("B1")[0]["note"] == "n"
+
+
+def test_dumps_json_matches_stdlib_semantics():
+    import json
+
+    for obj in ({"a": [1, 2.5, "é"]}, {"a": None}, {"v": float("inf")}, {"big": 2**70}, {1: "int key"}):
+        assert json.loads(case_store._dumps_json(obj)) == json.loads(json.dumps(obj))
+
+
+def test_lookup_cache_accepts_keyword_arguments():
+    case_store.create_case("C1", "Board")
+    assert case_store.get_case(case_id="C1")["title"] == "Board"
+    assert case_store.get_case("C1") == case_store.get_case(case_id="C1")
+    case_store.create_case("C1", "Renamed")
+    assert case_store.get_case(case_id="C1")["title"] == "Renamed"
+    assert case_store.list_expected_ranges(board_id="B1") == []
+
+
+def test_threads_share_one_connection():
+    import threading
+
+    case_store.create_case("C1", "Board")
+    def _work(i):
+        case_store.add_note("C1", f"n{i}")
+        case_store.list_notes("C1")
+
+    threads = [threading.Thread(target=_work, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(case_store.list_notes("C1")) == 20
+    assert list(case_store._CONNS) == [case_store.SETTINGS.sqlite_path]
+    assert list(case_store._RO_CONNS) == [case_store.SETTINGS.sqlite_path]
+
+
+def test_dumps_json_uses_orjson_for_none_values(monkeypatch):
+    if case_store._orjson is None:
+        pytest.skip("orjson not installed")
+
+    def _no_stdlib(*a, **k):
+        raise AssertionError("expected the orjson path")
+
+    monkeypatch.setattr(case_store.json, "dumps", _no_stdlib)
+    assert case_store._dumps_json({"unit": None, "text": "null", "v": [1.5, None]}) == '{"unit":null,"text":"null","v":[1.5,null]}'
+
+
+def test_failed_attachment_keeps_existing_file():
+    case_store.create_case("C1", "Board")
+    path = Path(case_store.save_attachment("C1", "x.png", b"first", "image"))
+
+    class _Broken:
+        def read(self, n=-1):
+            raise OSError("upload interrupted")
+
+    with pytest.raises(OSError):
+        case_store.save_attachment("C1", "x.png", _Broken(), "image")
+    assert path.read_bytes() == b"first"
+    assert sorted(p.name for p in path.parent.iterdir()) == ["x.png"]
+    assert len(case_store.list_attachments("C1")) == 1
@@ -66,3 +66,23 @@ def test_get_measure_points_dict_items():
     points = get_measure_points(board_id, "PPBUS_AON", k=5)
     assert points[0] == "P1"
     assert "C12" in points
+
+
+def test_measurement_points_for_nets_bulk(monkeypatch):
+    import boardbrain.net_refs as net_refs_mod
+
+    monkeypatch.setattr(net_refs_mod, "load_netlist", lambda **_: ({"PPBUS_AON", "PP3V3_S2"}, {}))
+    monkeypatch.setattr(
+        net_refs_mod,
+        "load_net_refs",
+        lambda **_: ({"PPBUS_AON": ["R10", "C12", "TP1"], "PP3V3_S2": ["U7"]}, {}),
+    )
+    out = net_refs_mod.measurement_points_for_nets(
+        "TEST",
+        ["PPBUS_AON", "PP3V3_S2", "NO_SUCH_NET"],
+        k=2,
+        known_components={"R10", "C12", "TP1"},
+    )
+    assert out["PPBUS_AON"] == ["TP1", "C12"]
+    assert out["PP3V3_S2"] == []
+    assert out["NO_SUCH_NET"] == []
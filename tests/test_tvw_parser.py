@@ -12,3 +12,22 @@ def test_tvw_parser_smoke():
     assert meta.get("format") == "TVW_STRINGS"
     assert len(nets) > 100
     assert len(meta.get("components") or []) > 100
+
+
+def test_parse_tvw_adjacent_pairs(tmp_path):
+    from boardbrain.boardview.tvw_parser import parse_tvw
+
+    pairs = [("PPBUS_AON", "U7000"), ("TP8010", "PP3V3_S2"), ("GND", "C1201"), ("PPBUS_AON", "R7012")]
+    buf = bytearray(b"TVW\x01\x02")
+    for net, ref in pairs:
+        buf += net.encode("ascii") + b"\x00" + ref.encode("ascii") + b"\x00\xff"
+    buf += b"SOT23_PAD\x00\x01\x02LED_0402\x00\x03"
+    path = tmp_path / "board.tvw"
+    path.write_bytes(bytes(buf))
+
+    nets, net_to_refs, meta = parse_tvw(str(path))
+    assert nets == {"PPBUS_AON", "PP3V3_S2", "GND"}
+    assert [r["refdes"] for r in net_to_refs["PPBUS_AON"]] == ["U7000", "C1201", "R7012"]
+    assert net_to_refs["PP3V3_S2"] == [{"refdes": "TP8010", "kind": "TP"}]
+    assert meta["components"] == ["C1201", "R7012", "TP8010", "U7000"]
+    assert meta["parse_status"] == "partial_success"
@@ -1,7 +1,9 @@
 import os
+import struct
+
 import pytest
 
-from boardbrain.boardview.xzzpcb_parser import parse_xzzpcb, verify_xzzpcb
+from boardbrain.boardview.xzzpcb_parser import XZZ_MAGIC, XZZ_MASTER_KEY, parse_xzzpcb, verify_xzzpcb
 
 
 def test_xzzpcb_parser_sample():
@@ -16,3 +18,46 @@ def test_xzzpcb_parser_sample():
     assert len(nets) > 0
     assert meta.get("components_count", 0) > 0
     assert meta.get("pairs_count", 0) > 0
+
+
+def _u32(v: int) -> bytes:
+    return struct.pack("<I", v)
+
+
+def _make_xzzpcb(path, key: int) -> None:
+    from Crypto.Cipher import DES
+
+    nets = {1: b"PPBUS_AON", 2: b"GND"}
+    net_block = b"".join(_u32(len(n) + 8) + _u32(i) + n for i, n in nets.items())
+    pin_name = b"1"
+    pin = _u32(0) + _u32(150000) + _u32(250000) + b"\x00" * 8 + _u32(len(pin_name)) + pin_name + b"\x00" * 32 + _u32(1)
+    part = b"\x00" * 18 + _u32(0) + b"\x06" + b"\x00" * 30 + _u32(2) + b"U1" + b"\x09" + _u32(len(pin)) + pin
+    plain = _u32(len(part)) + part
+    plain += b"\x00" * ((-len(plain)) % 8)
+    enc = DES.new(key.to_bytes(8, "big"), DES.MODE_ECB).encrypt(plain)
+    tp_name = b"7"
+    tp = _u32(0) + _u32(50000) + _u32(60000) + b"\x00" * 8 + _u32(len(tp_name)) + tp_name + _u32(2)
+    blocks = b"\x07" + _u32(len(enc)) + enc + b"\x09" + _u32(len(tp)) + tp
+    buf = bytearray(XZZ_MAGIC + b"\x00" * 0x2A)
+    buf[0x20:0x24] = _u32(len(buf) - 0x20)
+    buf += _u32(len(blocks)) + blocks
+    buf[0x28:0x2C] = _u32(len(buf) - 0x20)
+    buf += _u32(len(net_block)) + net_block
+    path.write_bytes(bytes(buf))
+
+
+def test_xzzpcb_parser_synthetic(tmp_path, monkeypatch):
+    pytest.importorskip("Crypto.Cipher.DES")
+    monkeypatch.delenv("BOARDVIEW_XZZPCB_KEY", raising=False)
+    monkeypatch.delenv("XZZPCB_KEY", raising=False)
+    monkeypatch.setenv("HOME", str(tmp_path))
+    path = tmp_path / "board.pcb"
+    _make_xzzpcb(path, XZZ_MASTER_KEY)
+    nets, net_to_refs, meta = parse_xzzpcb(str(path))
+    assert nets == {"PPBUS_AON", "GND"}
+    assert net_to_refs["PPBUS_AON"] == [{"refdes": "U1", "kind": "U", "side": "top"}]
+    assert net_to_refs["GND"] == [{"refdes": "TP7", "kind": "TP", "side": "top"}]
+    assert meta["key_source"] == "master_key"
+    assert meta["components"] == ["U1", "TP7"]
+    assert (meta["component_details"][0]["x"], meta["component_details"][0]["y"]) == (15, 25)
+    assert meta["testpoints"][0]["x"] == 5